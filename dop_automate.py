@@ -22,13 +22,16 @@ COMPLETE FLOW
    Step 5.  Validate every row's "Next RD Installment Due Date" is in current month
             → If any mismatch → SKIP this LOT (log bad accounts)
    Step 6.  Select all checkboxes across all pages (pagination-safe)
-   Step 7.  Re-read display count → verify selected == total ("X of X")
+            (only after Step 5 passed on every page; a one-page LOT does both
+             on the same visit, longer LOTs walk the pages twice)
+   Step 7.  Verify selected == total ("X of X") from the display count — re-read
+            after a multi-page walk; a one-page LOT reuses Step 4's line
    Step 8.  Click "Save" → portal redirects to "Selected Recurring Deposit Account List"
    Step 9.  Click "Pay All Saved Installments"
             → Parse success message for Reference ID (e.g. C320461082)
             → Store Reference_ID in XLSX (green column)
             → Portal auto-redirects back to Deposit Accounts page
-   Step 10. Save progress to XLSX after every LOT
+   Step 10. Save progress after every LOT (journal entry; full XLSX every 10 LOTs)
             → Next LOT starts from Step 1 (old text cleared, Cash stays selected)
 
  PHASE 2 — PDF Downloads (after all LOTs are done):
@@ -37,8 +40,9 @@ COMPLETE FLOW
       a. Enter Reference ID in "List Reference No" field
       b. Click "Search" → verify result count matches expected Count
       c. Ensure "PDF file" is selected in dropdown → click "OK"
-      d. Wait for download → rename file to <LOT#>_<RefID>.pdf
-      e. Manually clear reference field (Cmd+A → Delete) → repeat for next LOT
+         (Chrome is pointed at a per-LOT folder first, so the file is unambiguous)
+      d. Wait for download → move file to <LOT#>_<RefID>.pdf
+      e. Overwrite the reference field in place → repeat for next LOT
          (does NOT click Clear button — that would reset date fields too)
    3. All PDFs saved to: ~/Downloads/LOT_<YYYY-MM-DD>/
 
@@ -50,58 +54,97 @@ COMPLETE FLOW
  RESUMABILITY:
    - LOTs with Pay_Status=OK are skipped on re-run
    - PDFs already on disk (matching filename) are skipped
-   - Progress saved to XLSX after every single LOT
+   - Progress journaled after every single LOT (<xlsx>.progress.jsonl) and
+     replayed on the next start if the run was interrupted before the XLSX save
 
  PACING:
-   All actions have deliberate delays (DELAY_SHORT=1.5s, DELAY_MEDIUM=3s,
-   DELAY_LONG=5s, DELAY_CHECKBOX=0.4s) to avoid spam-like behaviour on the
-   banking portal. No confirmation prompts between LOTs — just a steady pace.
+   Every click waits for the DOM condition the next step depends on (explicit
+   WebDriverWaits, polling every POLL_INTERVAL). The dashboard delays
+   (DELAY_SHORT=1.5s, DELAY_MEDIUM=3s, DELAY_LONG=5s) are only slept when that
+   condition never shows up, and the pause between LOTs scales with how fast the
+   portal has been responding (at most DELAY_LONG). No confirmation prompts
+   between LOTs — just a steady pace.
+
+   INVARIANT: the driver's implicit wait stays 0 (IMPLICIT_WAIT). Optional lookups
+   probe with find_elements / first_present and expect an instant empty answer;
+   any implicit wait would turn each miss into a stall of that many seconds.
 """
 
 import time
 import sys
 import re
 import os
-import glob as glob_mod
+import json
+import gc
+import logging
+import atexit
+import signal
 import platform
+import shutil
+import subprocess
+import tempfile
 import threading
 import psutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, date
+from itertools import groupby
+from operator import attrgetter
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.common.alert import Alert
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException,
+                                        NoAlertPresentException, StaleElementReferenceException)
 from dop_dashboard import (
     DashboardState, ControlFlags, SkipLotException,
-    StopAfterCurrentException, checkpoint, start_dashboard
+    StopAfterCurrentException, checkpoint, pause_for_review, start_dashboard
 )
 
 # ── Dashboard shared state ──
 dashboard_state = DashboardState()
 control_flags = ControlFlags()
 
-# Override print to also feed dashboard log
-_original_print = print
+# Override print to log through the "dop" logger: one record per call, written to the
+# terminal as-is and to the dashboard log with a timestamp. Each handler serialises its
+# own output, so lines from the Phase 2 download thread never interleave — which is
+# also what keeps writes to the dashboard's lock-free log ring buffer in order.
+
+class _DashboardLogHandler(logging.Handler):
+    """Append each formatted record to the dashboard's log."""
+    def emit(self, record):
+        dashboard_state.log(self.format(record))
+
+
+logger = logging.getLogger("dop")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter("%(message)s"))
+_dashboard_handler = _DashboardLogHandler()
+_dashboard_handler.setFormatter(logging.Formatter("%(asctime)s  %(message)s", datefmt="%H:%M:%S"))
+logger.addHandler(_console_handler)
+logger.addHandler(_dashboard_handler)
+
+
 def print(*args, **kwargs):
-    sep = kwargs.get("sep", " ")
-    msg = sep.join(str(a) for a in args)
-    _original_print(*args, **kwargs)
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    with dashboard_state.lock:
-        dashboard_state.log_messages.append(f"{timestamp}  {msg}")
+    logger.info(kwargs.get("sep", " ").join(map(str, args)))
 
 # ── Configuration ──
 XLSX_FILE = ""  # Set at startup from user-provided Excel path (primary input/output)
 PORTAL_URL = "https://dopagent.indiapost.gov.in/corp/Finacle"
 WAIT_TIMEOUT = 30  # seconds to wait for elements
-
-# Delays (seconds) - kept gentle to avoid spam-like behaviour
-DELAY_SHORT = 1.5     # after small actions (clicking radio, clearing fields)
-DELAY_MEDIUM = 3.0    # after fetch, page loads
-DELAY_LONG = 5.0      # between LOTs, after save
-DELAY_CHECKBOX = 0.4  # between each checkbox click
+POLL_INTERVAL = 0.1  # seconds between WebDriverWait polls
+RESULTS_SWAP_TIMEOUT = 5  # seconds to wait for old results to go; the portal may update in place
+IMPLICIT_WAIT = 0  # seconds; keep 0 — explicit waits are used everywhere
+PAGE_SIZE = 10  # Rows per results page on the portal
+
+# Delays (seconds) — fallbacks, slept only when a wait for the page times out (see PACING)
+DELAY_SHORT = 1.5     # small actions (clicking radio, clearing fields)
+DELAY_MEDIUM = 3.0    # fetch, page loads
+DELAY_LONG = 5.0      # cap on the pause between LOTs; slept in full after a failed LOT
 GLOBAL_TIMEOUT_MINS = 30  # Auto-exit after this many minutes to prevent hangs
 
 # Current month for due-date validation (e.g. "Feb" for February)
@@ -123,148 +166,482 @@ XLSX_COLUMNS = [
 ]
 
 
+# Precompiled patterns for the per-LOT parsing hot paths
+_DISPLAY_RE = re.compile(r'Displaying\s+(\d+)\s*-\s*(\d+)\s+of\s+(\d+)')
+_PAGE_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+_REF_RE = re.compile(r'reference\s+number\s+is\s+([A-Za-z0-9]+)')
+_REF_FALLBACK_RE = re.compile(r'([A-Z]\d{6,})')
+_MONTH_RE = re.compile(r'\b\d{1,2}-([A-Z][a-z]{2})-\d{2,4}\b')  # "Feb" in "Due 15-Feb-2026"
+_DATE_VALUE_RE = re.compile(r'\d{2}-\w{3}-\d{4}')  # A date field's value, "01-Feb-2026"
+
+# Element locators — CSS wherever no text matching is needed (native querySelector,
+# much cheaper than a document-wide XPath walk); XPath only for text-based lookups.
+CASH_RADIO = (By.CSS_SELECTOR, "input[type='radio'][value='C']")
+ANY_RADIO = (By.CSS_SELECTOR, "input[type='radio']")
+ACCOUNT_TEXTAREA = (By.TAG_NAME, "textarea")
+ACCOUNT_INPUT = (By.CSS_SELECTOR, "textarea, input[name*='account'], input[name*='Account']")
+CLEAR_ACCOUNT_BTN = (By.CSS_SELECTOR, "input[value*='Clear']")
+FETCH_BTN = (By.CSS_SELECTOR, "input[value*='Fetch']")
+SAVE_BTN = (By.CSS_SELECTOR, "input[value*='Save']")
+PAY_ALL_BTN = (By.CSS_SELECTOR, "input[value*='Pay All Saved']")
+PAGE_INPUT = (By.CSS_SELECTOR, "input[type='text'][name*='page'], input[type='text'][title*='Page']")
+GO_BTN = (By.CSS_SELECTOR, "input[value='Go']")
+DEPOSIT_PAGE_MARKER = (By.CSS_SELECTOR, "input[value='Fetch'], textarea")
+DATA_CHECKBOX_CSS = "table td input[type='checkbox']"
+HEADER_CHECKBOX_CSS = "table th input[type='checkbox']"
+DISPLAYING = (By.XPATH, "//*[contains(text(), 'Displaying')]")
+SAVED_LIST = (By.XPATH, "//*[contains(text(), 'Selected Recurring Deposit Account List')]")
+PAY_RESULT = (By.XPATH, "//*[contains(text(), 'Payment successful') or contains(text(), 'payment reference')]")
+REPORT_REF_INPUT = (By.XPATH,
+    "//input[contains(@name, 'referenceNo') or contains(@name, 'Reference') or contains(@name, 'listRef')]")
+REPORT_REF_LABEL = (By.XPATH, "//*[contains(text(), 'List Reference No')]")
+LABEL_SIBLING_INPUT = (By.XPATH, "./..//input[@type='text']")
+REPORTS_LINK = (By.XPATH, "//a[contains(text(), 'Reports')]")
+REPORTS_HEADING = (By.XPATH, "//*[contains(text(), 'RECURRING DEPOSIT INSTALLMENT REPORT')]")
+SEARCH_BTN = (By.CSS_SELECTOR, "input[value='Search']")
+DOWNLOAD_FORMAT_SELECT = (By.CSS_SELECTOR, "select[name*='download'], select[name*='format']")
+OK_BTN = (By.CSS_SELECTOR, "input[value='OK']")
+TEXT_INPUT = (By.CSS_SELECTOR, "input[type='text']")
+
+# Wait conditions on the fixed locators above — built once and reused by every wait
+DEPOSIT_PAGE_SHOWN = EC.presence_of_element_located(DEPOSIT_PAGE_MARKER)
+ACCOUNT_TEXTAREA_SHOWN = EC.presence_of_element_located(ACCOUNT_TEXTAREA)
+SAVED_LIST_SHOWN = EC.presence_of_element_located(SAVED_LIST)
+REPORTS_HEADING_SHOWN = EC.presence_of_element_located(REPORTS_HEADING)
+SAVE_BTN_CLICKABLE = EC.element_to_be_clickable(SAVE_BTN)
+PAY_ALL_BTN_CLICKABLE = EC.element_to_be_clickable(PAY_ALL_BTN)
+OK_BTN_CLICKABLE = EC.element_to_be_clickable(OK_BTN)
+
+
 # ── XLSX Read / Write ──
 
+@dataclass
+class Lot:
+    """
+    One LOT row of the session XLSX. Attributes are the XLSX column names with
+    spaces replaced by underscores ("RD Numbers" → RD_Numbers). Slotted, since a
+    session keeps thousands of these alive and a mistyped column should fail loudly.
+    """
+    __slots__ = ("LOT", "RD_Numbers", "Count", "Reference_ID", "Timestamp",
+                 "Fetch_Status", "Count_Match", "Due_Date_Check", "Selected",
+                 "Selection_Verified", "Save_Status", "Pay_Status", "Remarks")
+    LOT: str
+    RD_Numbers: str
+    Count: int
+    Reference_ID: str
+    Timestamp: str
+    Fetch_Status: str
+    Count_Match: str
+    Due_Date_Check: str
+    Selected: str
+    Selection_Verified: str
+    Save_Status: str
+    Pay_Status: str
+    Remarks: str
+
+    def to_dict(self):
+        """Column name → value, in XLSX column order."""
+        return {col: getattr(self, attr) for col, attr in zip(XLSX_COLUMNS, self.__slots__)}
+
+    def update(self, values):
+        """Apply a column-name → value mapping (e.g. a journal entry); unknown keys are ignored."""
+        for col, attr in zip(XLSX_COLUMNS, self.__slots__):
+            if col in values:
+                setattr(self, attr, values[col])
+
+
 def read_xlsx(filepath):
-    """Read the Excel file and return list of dicts with all columns."""
+    """Read the Excel file and return a list of Lot rows."""
     from openpyxl import load_workbook
-    wb = load_workbook(filepath)
+    wb = load_workbook(filepath, read_only=True, data_only=True)
     ws = wb.active
-    headers = [str(cell.value).strip() if cell.value is not None else "" for cell in ws[1]]
+    if ws.max_row == 1 and ws.max_column == 1:
+        ws.reset_dimensions()  # Stale <dimension> tag from some writers would hide every row
+    rows = ws.iter_rows(values_only=True)
+    headers = [str(v).strip() if v is not None else "" for v in next(rows, ())]
+    # Column position of each Lot field (None if the column is missing from the file)
+    positions = [headers.index(col) if col in headers else None for col in XLSX_COLUMNS]
+    count_idx = XLSX_COLUMNS.index("Count")
     lots = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
+    for row in rows:
         if all(v is None for v in row):
             continue  # skip fully empty rows
-        rd = dict(zip(headers, row))
-        lot = {
-            "LOT":                str(rd.get("LOT", "") or "").strip(),
-            "RD Numbers":         str(rd.get("RD Numbers", "") or "").strip(),
-            "Count":              int(rd.get("Count", 0) or 0),
-            "Reference_ID":       str(rd.get("Reference_ID", "") or "").strip(),
-            "Timestamp":          str(rd.get("Timestamp", "") or "").strip(),
-            "Fetch_Status":       str(rd.get("Fetch_Status", "") or "").strip(),
-            "Count_Match":        str(rd.get("Count_Match", "") or "").strip(),
-            "Due_Date_Check":     str(rd.get("Due_Date_Check", "") or "").strip(),
-            "Selected":           str(rd.get("Selected", "") or "").strip(),
-            "Selection_Verified": str(rd.get("Selection_Verified", "") or "").strip(),
-            "Save_Status":        str(rd.get("Save_Status", "") or "").strip(),
-            "Pay_Status":         str(rd.get("Pay_Status", "") or "").strip(),
-            "Remarks":            str(rd.get("Remarks", "") or "").strip(),
-        }
-        lots.append(lot)
+        raw = [row[i] if i is not None and i < len(row) else None for i in positions]
+        values = [str(v or "").strip() for v in raw]
+        values[count_idx] = int(raw[count_idx] or 0)
+        lots.append(Lot(*values))
+    wb.close()
     return lots
 
 
+# Layout of the written XLSX (the styles need openpyxl, so they are built on first use)
+XLSX_COL_WIDTHS = {
+    "LOT": 6, "RD Numbers": 60, "Count": 7, "Reference_ID": 18,
+    "Timestamp": 22, "Fetch_Status": 13, "Count_Match": 18,
+    "Due_Date_Check": 16, "Selected": 10, "Selection_Verified": 20,
+    "Save_Status": 13, "Pay_Status": 12, "Remarks": 40
+}
+_REF_COL_IDX = XLSX_COLUMNS.index("Reference_ID")  # 0-based position in each row
+_lot_row = attrgetter(*Lot.__slots__)  # Lot → tuple of values in XLSX column order
+_xlsx_styles = None
+
+
+def _get_xlsx_styles():
+    """Header and green Reference_ID styles, created once per session."""
+    global _xlsx_styles
+    if _xlsx_styles is None:
+        from openpyxl.styles import PatternFill, Font, Alignment
+        _xlsx_styles = {
+            "header_fill": PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            "header_font": Font(bold=True, color="FFFFFF", size=11),
+            "header_align": Alignment(horizontal="center"),
+            "green_fill": PatternFill(start_color="92D050", end_color="92D050", fill_type="solid"),
+            "green_font": Font(bold=True, size=11),
+        }
+    return _xlsx_styles
+
+
 def write_xlsx(filepath, lots):
-    """Write a formatted XLSX with green Reference_ID column."""
+    """Write a formatted XLSX with green Reference_ID column (streamed, write-only mode)."""
     try:
         from openpyxl import Workbook
-        from openpyxl.styles import PatternFill, Font, Alignment
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "RD Session"
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
 
-        # Header row
-        headers = XLSX_COLUMNS
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-
-        # Green fill for Reference_ID column
-        green_fill = PatternFill(start_color="92D050", end_color="92D050", fill_type="solid")
-        green_font = Font(bold=True, size=11)
-        ref_col_idx = headers.index("Reference_ID") + 1  # 1-based
-
-        # Data rows
-        for row_idx, lot in enumerate(lots, 2):
-            for col_idx, header in enumerate(headers, 1):
-                value = lot.get(header, "")
-                cell = ws.cell(row=row_idx, column=col_idx, value=value)
-
-                # Green highlight for Reference_ID column
-                if col_idx == ref_col_idx and value:
-                    cell.fill = green_fill
-                    cell.font = green_font
-
-        # Auto-fit column widths (approximate)
-        col_widths = {
-            "LOT": 6, "RD Numbers": 60, "Count": 7, "Reference_ID": 18,
-            "Timestamp": 22, "Fetch_Status": 13, "Count_Match": 18,
-            "Due_Date_Check": 16, "Selected": 10, "Selection_Verified": 20,
-            "Save_Status": 13, "Pay_Status": 12, "Remarks": 40
-        }
-        for col_idx, header in enumerate(headers, 1):
-            ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = col_widths.get(header, 15)
+        styles = _get_xlsx_styles()
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("RD Session")
 
-        # Freeze top row
+        # Column widths and frozen header must be set before any row is streamed
+        for col_idx, header in enumerate(XLSX_COLUMNS, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = XLSX_COL_WIDTHS.get(header, 15)
         ws.freeze_panes = "A2"
 
+        # Header row
+        header_cells = []
+        for header in XLSX_COLUMNS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = styles["header_fill"]
+            cell.font = styles["header_font"]
+            cell.alignment = styles["header_align"]
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        # Data rows: plain values, except a styled cell for a filled-in Reference_ID
+        for lot in lots:
+            row = _lot_row(lot)
+            if row[_REF_COL_IDX]:
+                row = list(row)
+                cell = WriteOnlyCell(ws, value=row[_REF_COL_IDX])
+                cell.fill = styles["green_fill"]
+                cell.font = styles["green_font"]
+                row[_REF_COL_IDX] = cell
+            ws.append(row)
+
         wb.save(filepath)
         print(f"  Formatted XLSX saved: {filepath}")
+        return True
     except ImportError:
         print("  ⚠ openpyxl not installed, skipping XLSX generation")
     except Exception as e:
         print(f"  ⚠ Could not write XLSX: {e}")
+    return False
+
+
+# ── Progress journal ──
+# Rewriting the whole XLSX after every LOT is O(N) per LOT (O(N²) per session).
+# Instead each finished LOT is appended to a small JSONL journal next to the
+# XLSX, and the full XLSX is only rewritten every XLSX_SAVE_EVERY LOTs and on
+# exit. A journal left behind by a crash is replayed on the next start.
+
+XLSX_SAVE_EVERY = 10  # Full XLSX rewrite cadence, in LOTs
+
+_journal_file = None
+_lots_since_save = 0
+_lot_in_progress = None  # LOT mutated since the last journal write (saved on an abrupt exit)
+
+
+def journal_path(filepath):
+    """Path of the progress journal that belongs to an XLSX file."""
+    return filepath + ".progress.jsonl"
+
+
+def replay_journal(filepath, lots):
+    """Apply journal entries left by an interrupted run onto lots. Returns entries applied."""
+    path = journal_path(filepath)
+    if not os.path.exists(path):
+        return 0
+    by_lot = {lot.LOT: lot for lot in lots}
+    applied = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a crash mid-write
+            lot = by_lot.get(str(entry.get("LOT", "")))
+            if lot is not None:
+                lot.update(entry)
+                applied += 1
+    return applied
+
+
+def begin_lot_progress(lot_data):
+    """Mark a LOT as being processed, so Ctrl-C or a crash before it is journaled
+    still writes its partial status (e.g. a Reference ID just captured) on exit."""
+    global _lot_in_progress
+    _lot_in_progress = lot_data
+
+
+def save_progress(filepath, lots, lot_data):
+    """Journal one finished LOT; rewrite the full XLSX every XLSX_SAVE_EVERY LOTs."""
+    global _journal_file, _lots_since_save, _lot_in_progress
+    _lot_in_progress = None
+    if _journal_file is None:
+        _journal_file = open(journal_path(filepath), "a", encoding="utf-8")
+    _journal_file.write(json.dumps(lot_data.to_dict()) + "\n")
+    _journal_file.flush()
+    os.fsync(_journal_file.fileno())  # A paid LOT must survive a power cut or OS crash too
+    _lots_since_save += 1
+    if _lots_since_save >= XLSX_SAVE_EVERY:
+        flush_progress(filepath, lots)
+
+
+def flush_progress(filepath, lots):
+    """Rewrite the full XLSX and, once it is safely on disk, drop the journal."""
+    global _journal_file, _lots_since_save, _lot_in_progress
+    if not write_xlsx(filepath, lots):
+        return False  # Keep the journal — it still holds the progress
+    _lot_in_progress = None
+    if _journal_file is not None:
+        _journal_file.close()
+        _journal_file = None
+    try:
+        os.remove(journal_path(filepath))
+    except FileNotFoundError:
+        pass
+    _lots_since_save = 0
+    return True
 
 
 # ── Global timeout ──
+# On POSIX the timeout is a SIGALRM interval timer: no extra thread, and the
+# handler reads the session's LOTs from _session_lots rather than a captured
+# reference. Windows has no SIGALRM, so it falls back to a daemon Timer thread.
+
+_session_lots = None  # LOTs of the running session, for the timeout/exit handlers
+_timeout_timer = None  # Windows fallback only
+
 
-def _global_timeout_handler(lots):
-    """Called by the timer thread when the global timeout expires."""
+def _global_timeout_handler(*_):
+    """Called when the global timeout expires (SIGALRM handler or fallback timer)."""
     print(f"\n{'=' * 60}")
     print(f"  GLOBAL TIMEOUT ({GLOBAL_TIMEOUT_MINS} min) REACHED")
     print(f"  Saving progress and exiting to prevent system hang.")
     print(f"{'=' * 60}")
     try:
-        write_xlsx(XLSX_FILE, lots)
+        flush_progress(XLSX_FILE, _session_lots)
         print(f"  Progress saved. Restart the script to resume.")
     except Exception as e:
         print(f"  ⚠ Could not save progress: {e}")
     os._exit(1)  # Hard exit — works even if main thread is stuck in input()/sleep()
 
 
+def _flush_on_exit():
+    """atexit hook (also runs after Ctrl-C): write progress the XLSX does not have yet."""
+    unsaved = _journal_file is not None or _lot_in_progress is not None
+    if unsaved and _session_lots is not None:
+        flush_progress(XLSX_FILE, _session_lots)
+
+
 def start_global_timeout(lots):
-    """Start a daemon timer that will force-exit after GLOBAL_TIMEOUT_MINS."""
+    """Arm a timer that will save progress and force-exit after GLOBAL_TIMEOUT_MINS."""
+    global _session_lots, _timeout_timer
+    _session_lots = lots
+    atexit.register(_flush_on_exit)
     seconds = GLOBAL_TIMEOUT_MINS * 60
-    timer = threading.Timer(seconds, _global_timeout_handler, args=[lots])
-    timer.daemon = True  # Won't prevent normal exit
-    timer.start()
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _global_timeout_handler)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    else:
+        _timeout_timer = threading.Timer(seconds, _global_timeout_handler)
+        _timeout_timer.daemon = True  # Won't prevent normal exit
+        _timeout_timer.start()
     print(f"  Global timeout set: {GLOBAL_TIMEOUT_MINS} minutes")
-    return timer
+
+
+def stop_global_timeout():
+    """Disarm the global timeout once the session has finished normally."""
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    elif _timeout_timer is not None:
+        _timeout_timer.cancel()
 
 
 # ── Memory watchdog ──
 
 MEMORY_LIMIT_MB = 3500  # Kill script if Chrome + Python exceed this
+PROC_REFRESH_EVERY = 5  # Re-scan the driver's process tree every N memory checks
+CHROME_PID_FILE = os.path.join(tempfile.gettempdir(), "dop_automate_chrome.pids")
+
+# Processes of the Chrome we launched (children of chromedriver), cached so the
+# watchdog does not have to walk every process on the system on each check.
+_chromedriver_pid = None
+_chrome_procs = []
+_memory_checks = 0
+_python_proc = psutil.Process()  # This script's own process, created once
+
+
+def _is_automation_chrome(proc):
+    """True for Chrome processes launched by WebDriver (have --test-type=webdriver flag)."""
+    if 'chrome' not in (proc.name() or '').lower():
+        return False
+    return any('--test-type=webdriver' in arg for arg in proc.cmdline() or [])
+
+
+def _refresh_chrome_procs():
+    """Re-read the chromedriver process tree and persist the Chrome PIDs for the next run."""
+    global _chrome_procs
+    try:
+        _chrome_procs = psutil.Process(_chromedriver_pid).children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        _chrome_procs = []
+    try:
+        with open(CHROME_PID_FILE, "w") as f:
+            f.write("\n".join(str(p.pid) for p in _chrome_procs))
+    except OSError:
+        pass
+
+
+def track_driver_processes(driver):
+    """Remember the Chrome processes spawned by this driver's chromedriver."""
+    global _chromedriver_pid
+    try:
+        _chromedriver_pid = driver.service.process.pid
+    except AttributeError:
+        return  # No local chromedriver process (e.g. remote driver)
+    _refresh_chrome_procs()
 
 
 def _get_memory_mb():
     """Get total memory usage (Python + Chrome automation) in MB."""
+    global _memory_checks, _chrome_procs
     try:
-        python_proc = psutil.Process(os.getpid())
-        python_mb = python_proc.memory_info().rss / (1024 * 1024)
+        python_mb = _python_proc.memory_info().rss / (1024 * 1024)
+        if _chromedriver_pid is None:
+            return python_mb
+        # Renderers come and go, so refresh the cached tree every few checks
+        _memory_checks += 1
+        if _memory_checks % PROC_REFRESH_EVERY == 0:
+            _refresh_chrome_procs()
         chrome_mb = 0
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        alive = []
+        for proc in _chrome_procs:
             try:
-                if proc.info['name'] and 'chrome' in proc.info['name'].lower():
-                    cmdline = proc.info.get('cmdline') or []
-                    if any('--test-type=webdriver' in arg for arg in cmdline):
-                        chrome_mb += proc.memory_info().rss / (1024 * 1024)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+                chrome_mb += proc.memory_info().rss / (1024 * 1024)
+                alive.append(proc)
+            except psutil.NoSuchProcess:
+                continue  # Exited renderer — drop it until the next refresh
+            except psutil.AccessDenied:
+                alive.append(proc)
+        _chrome_procs = alive
         return python_mb + chrome_mb
     except Exception:
         return 0.0
 
 
+# OS memory-pressure notifications: while a watcher is running, the per-LOT
+# psutil probe runs after the OS has reported pressure, and otherwise at least
+# every MEMORY_PROBE_INTERVAL — system-wide pressure says nothing about Chrome
+# outgrowing MEMORY_LIMIT_MB on a machine with RAM to spare. Without a watcher
+# (Windows, or no PSI support) every LOT is probed as before.
+
+PSI_TRIGGER = b"some 200000 2000000"  # Linux: 200 ms of memory stall within a 2 s window
+MEMORY_PROBE_INTERVAL = 120  # Seconds between probes while the OS reports no pressure
+
+_memory_pressure = threading.Event()
+_pressure_watcher = None  # Name of the running watcher, or None
+_pressure_handles = []  # Keeps the macOS dispatch source and callback alive
+_last_memory_probe = 0.0  # time.monotonic() of the last psutil probe
+
+
+def _watch_macos_memory_pressure():
+    """Subscribe to libdispatch memory-pressure events (warn/critical). Returns success."""
+    import ctypes
+    lib = ctypes.CDLL("/usr/lib/system/libdispatch.dylib")
+    source_type = ctypes.c_void_p.in_dll(lib, "_dispatch_source_type_memorypressure")
+    lib.dispatch_get_global_queue.restype = ctypes.c_void_p
+    lib.dispatch_get_global_queue.argtypes = [ctypes.c_long, ctypes.c_ulong]
+    lib.dispatch_source_create.restype = ctypes.c_void_p
+    lib.dispatch_source_create.argtypes = [ctypes.c_void_p, ctypes.c_size_t,
+                                           ctypes.c_ulong, ctypes.c_void_p]
+    handler_type = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+    lib.dispatch_source_set_event_handler_f.argtypes = [ctypes.c_void_p, handler_type]
+    lib.dispatch_resume.argtypes = [ctypes.c_void_p]
+
+    warn_or_critical = 0x2 | 0x4  # DISPATCH_MEMORYPRESSURE_WARN | _CRITICAL
+    queue = lib.dispatch_get_global_queue(0, 0)
+    source = lib.dispatch_source_create(ctypes.addressof(source_type), 0,
+                                        warn_or_critical, queue)
+    if not source:
+        return False
+    handler = handler_type(lambda _context: _memory_pressure.set())
+    lib.dispatch_source_set_event_handler_f(source, handler)
+    lib.dispatch_resume(source)
+    _pressure_handles.extend([source, handler])
+    return True
+
+
+def _watch_linux_memory_pressure():
+    """Register a PSI trigger on /proc/pressure/memory and poll it on a daemon thread."""
+    import select
+    f = open("/proc/pressure/memory", "r+b", buffering=0)
+    try:
+        f.write(PSI_TRIGGER)
+    except OSError:
+        f.close()
+        return False
+    poller = select.poll()
+    poller.register(f, select.POLLPRI)
+
+    def watch():
+        while True:
+            for _, event in poller.poll():
+                if event & select.POLLERR:
+                    return  # Trigger went away; check_memory_usage keeps working off the flag
+                _memory_pressure.set()
+
+    threading.Thread(target=watch, name="memory-pressure", daemon=True).start()
+    _pressure_handles.append(f)
+    return True
+
+
+def start_memory_pressure_watch():
+    """Start the OS memory-pressure watcher for this platform, if there is one."""
+    global _pressure_watcher
+    watchers = {"Darwin": ("libdispatch", _watch_macos_memory_pressure),
+                "Linux": ("PSI", _watch_linux_memory_pressure)}
+    name, start = watchers.get(platform.system(), (None, None))
+    if start is None:
+        return
+    _memory_pressure.set()  # Still probe before the first LOT, for a baseline reading
+    try:
+        if start():
+            _pressure_watcher = name
+            print(f"  ✓ Memory-pressure notifications on ({name}); probing memory under pressure"
+                  f" or every {MEMORY_PROBE_INTERVAL}s")
+    except (OSError, AttributeError, ValueError):
+        pass  # Not supported here — fall back to probing every LOT
+
+
 def check_memory_usage(driver):
     """Check total memory used by Chrome + Python. Warn or abort if too high."""
+    global _last_memory_probe
+    if (_pressure_watcher and not _memory_pressure.is_set()
+            and time.monotonic() - _last_memory_probe < MEMORY_PROBE_INTERVAL):
+        return True  # No OS memory pressure since the last probe, and it was recent
+    _memory_pressure.clear()
+    _last_memory_probe = time.monotonic()
     total_mb = _get_memory_mb()
     with dashboard_state.lock:
         dashboard_state.memory_mb = total_mb
@@ -277,17 +654,64 @@ def check_memory_usage(driver):
 
 # ── Browser helpers ──
 
+CHROME_WEBDRIVER_PATTERN = "[Cc]hrom.*--test-type=webdriver"  # pkill -f regex (Chrome/Chromium)
+
+
+def _pkill_automation_chrome():
+    """
+    Kill every webdriver-launched Chrome with one pkill, which matches command lines
+    without Python reading each process's cmdline. Like _is_automation_chrome, the
+    pattern needs Chrome as well as the flag, so another driver's browser (Edge via
+    msedgedriver, say) is left alone. Returns (ran, killed_any);
+    ran is False where pkill is unavailable (e.g. Windows).
+    """
+    if platform.system() == "Windows" or not shutil.which("pkill"):
+        return False, False
+    try:
+        result = subprocess.run(["pkill", "-f", "--", CHROME_WEBDRIVER_PATTERN],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False, False
+    # Exit status: 0 = matched and signalled, 1 = nothing matched, anything else = error
+    return result.returncode in (0, 1), result.returncode == 0
+
+
+def _previous_chrome_candidates():
+    """Processes that may be leftover automation Chrome: the PIDs recorded by the
+    last run if available, otherwise every process on the system."""
+    try:
+        with open(CHROME_PID_FILE) as f:
+            pids = [int(line) for line in f if line.strip().isdigit()]
+    except OSError:
+        return psutil.process_iter()
+    procs = []
+    for pid in pids:
+        try:
+            procs.append(psutil.Process(pid))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return procs
+
+
 def kill_previous_automation_chrome():
     """Kill Chrome instances from previous automation runs (webdriver-spawned only)."""
+    if not os.path.exists(CHROME_PID_FILE):
+        # No record of the last run's PIDs — let pkill scan rather than psutil
+        ran, killed_any = _pkill_automation_chrome()
+        if ran:
+            if killed_any:
+                print(f"  Cleaned up leftover automation Chrome processes")
+                time.sleep(2)  # Give OS time to reclaim memory
+            else:
+                print(f"  No leftover automation Chrome processes found")
+            return
     killed = 0
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+    for proc in _previous_chrome_candidates():
         try:
-            if proc.info['name'] and 'chrome' in proc.info['name'].lower():
-                cmdline = proc.info.get('cmdline') or []
-                # Only kill Chrome instances launched by WebDriver (have --test-type=webdriver flag)
-                if any('--test-type=webdriver' in arg for arg in cmdline):
-                    proc.kill()
-                    killed += 1
+            # Only kill Chrome instances launched by WebDriver — also guards against PID reuse
+            if _is_automation_chrome(proc):
+                proc.kill()
+                killed += 1
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             continue
     if killed:
@@ -308,6 +732,8 @@ def setup_driver(download_dir=None):
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-extensions")
     options.add_experimental_option("detach", True)
+    # Navigation returns at DOMContentLoaded; every step then waits for the element it needs
+    options.page_load_strategy = "eager"
 
     if download_dir:
         os.makedirs(download_dir, exist_ok=True)
@@ -320,6 +746,10 @@ def setup_driver(download_dir=None):
         options.add_experimental_option("prefs", prefs)
 
     driver = webdriver.Chrome(options=options)
+    # Explicit waits only — an implicit wait would stack on top of every explicit wait
+    # and turn each find_elements miss into a full timeout
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    track_driver_processes(driver)
     return driver
 
 
@@ -336,94 +766,115 @@ def wait_for_login(driver):
     print("Continuing with automation...\n")
 
 
+def first_present(context, *locators):
+    """
+    Return the first element matched by any of the locators (tried in order), or None.
+    Uses find_elements, which returns [] instead of raising, so misses cost no exception.
+    context may be the driver or an element (for relative XPaths). A miss is instant
+    because the implicit wait is always 0 (see the INVARIANT in the module docstring).
+    """
+    for locator in locators:
+        found = context.find_elements(*locator)
+        if found:
+            return found[0]
+    return None
+
+
+# Runs in the page: "heading" if the page text says DEPOSIT ACCOUNTS, else "marker" if
+# the Fetch button or textarea (unique to this page) is there, else null
+DETECT_DEPOSIT_PAGE_JS = """
+if ((document.body.innerText || '').indexOf('DEPOSIT ACCOUNTS') >= 0) return 'heading';
+return document.querySelector(arguments[0]) ? 'marker' : null;
+"""
+
+
 def navigate_to_deposit_accounts(driver, wait):
     """Verify we are on the Deposit Accounts page."""
-    # Small pause to let page fully render after user presses ENTER
-    time.sleep(dashboard_state.delay_short)
-    # Check page title/heading — use text() to avoid matching every ancestor element
+    # Let the page finish rendering after user presses ENTER
+    wait_ready(wait, DEPOSIT_PAGE_SHOWN, dashboard_state.delay_short)
+    # Heading text and page marker checked in one script call
     try:
-        driver.find_element(By.XPATH,
-            "//b[contains(text(),'DEPOSIT ACCOUNTS')] | //h1[contains(text(),'DEPOSIT ACCOUNTS')] | //h2[contains(text(),'DEPOSIT ACCOUNTS')] | //span[contains(text(),'DEPOSIT ACCOUNTS')] | //td[contains(text(),'DEPOSIT ACCOUNTS')]")
+        found = driver.execute_script(DETECT_DEPOSIT_PAGE_JS, DEPOSIT_PAGE_MARKER[1])
+    except Exception:
+        found = None
+    if found == "heading":
         print("✓ On Deposit Accounts page")
-        return True
-    except NoSuchElementException:
-        # Fallback: check for the Fetch button or textarea (unique to this page)
-        try:
-            driver.find_element(By.XPATH,
-                "//input[@value='Fetch'] | //textarea")
-            print("✓ On Deposit Accounts page (detected via Fetch button)")
-            return True
-        except NoSuchElementException:
-            print("⚠ Could not auto-detect Deposit Accounts page.")
-            print("  (This is OK — continuing since you confirmed with ENTER)")
-            return True
+    elif found == "marker":
+        print("✓ On Deposit Accounts page (detected via Fetch button)")
+    else:
+        print("⚠ Could not auto-detect Deposit Accounts page.")
+        print("  (This is OK — continuing since you confirmed with ENTER)")
+    return True
 
 
 def ensure_cash_mode(driver):
     """Select Cash radio only if not already selected (avoids unnecessary clicks)."""
+    # Falls back to the first radio on the page if the Cash value is not found
+    cash_radio = first_present(driver, CASH_RADIO, ANY_RADIO)
+    if cash_radio is None:
+        print("  ⚠ Could not select Cash mode: no radio buttons on page")
+        return
     try:
-        cash_radio = driver.find_element(By.XPATH, "//input[@type='radio' and @value='C']")
         if cash_radio.is_selected():
             print("  ✓ Cash mode already selected")
             return
         cash_radio.click()
-        time.sleep(dashboard_state.delay_short)
+        wait_until(driver, lambda d: cash_radio.is_selected(), dashboard_state.delay_short)
         print("  ✓ Cash mode selected")
-    except NoSuchElementException:
-        try:
-            radios = driver.find_elements(By.XPATH, "//input[@type='radio']")
-            if radios and not radios[0].is_selected():
-                radios[0].click()
-                time.sleep(dashboard_state.delay_short)
-            print("  ✓ Cash mode selected (first radio)")
-        except Exception as e:
-            print(f"  ⚠ Could not select Cash mode: {e}")
+    except Exception as e:
+        print(f"  ⚠ Could not select Cash mode: {e}")
+
+
+# Runs in the page: overwrites the field's value and fires input/change so the
+# portal's JS validators still see the edit. Returns whether the value stuck.
+SET_FIELD_VALUE_JS = """
+const t = arguments[0];
+t.focus();
+t.value = arguments[1];
+t.dispatchEvent(new Event('input', {bubbles: true}));
+t.dispatchEvent(new Event('change', {bubbles: true}));
+return t.value === arguments[1];
+"""
+
+
+def type_over(driver, field, text):
+    """
+    Replace a field's contents by typing: select-all, Delete and the new text go in
+    one send_keys call (Keys.NULL releases the modifier), then wait for the value.
+    """
+    field.click()
+    field.send_keys(SELECT_ALL_KEY, "a", Keys.NULL, Keys.DELETE, text)
+    wait_until(driver, lambda d: field.get_attribute("value") == text, dashboard_state.delay_short)
 
 
 def clear_textarea_and_enter(driver, rd_numbers):
     """
-    Clear the textarea by selecting all text and deleting it (no page refresh),
-    then type in the new RD numbers.
+    Replace the textarea's contents with the new RD numbers (no page refresh).
+    Sets the value in one script call; falls back to select-all → delete → type
+    if the page did not accept the scripted value.
     """
-    textarea = None
-    try:
-        textarea = driver.find_element(By.TAG_NAME, "textarea")
-    except NoSuchElementException:
-        try:
-            textarea = driver.find_element(By.XPATH,
-                "//textarea | //input[contains(@name,'account') or contains(@name,'Account')]")
-        except NoSuchElementException:
-            print("  ✗ Could not find Account ID input field!")
-            return False
+    textarea = first_present(driver, ACCOUNT_TEXTAREA, ACCOUNT_INPUT)
+    if textarea is None:
+        print("  ✗ Could not find Account ID input field!")
+        return False
+
+    # Setting .value overwrites the old text, so no select-all/delete needed
+    if driver.execute_script(SET_FIELD_VALUE_JS, textarea, rd_numbers):
+        print("  ✓ Cleared old text & entered new RD numbers")
+        return True
 
-    # Select all existing text and delete (no page refresh unlike Clear Account btn)
-    textarea.click()
-    time.sleep(dashboard_state.delay_checkbox)
-    textarea.send_keys(SELECT_ALL_KEY, "a")
-    time.sleep(dashboard_state.delay_checkbox)
-    textarea.send_keys(Keys.DELETE)
-    time.sleep(dashboard_state.delay_short)
-
-    # Type new RD numbers
-    textarea.send_keys(rd_numbers)
-    time.sleep(dashboard_state.delay_short)
-    print("  ✓ Cleared old text & entered new RD numbers")
+    # Fallback: select all existing text, delete and type (no page refresh unlike Clear Account btn)
+    type_over(driver, textarea, rd_numbers)
+    print("  ✓ Cleared old text & entered new RD numbers (typed)")
     return True
 
 
 def click_fetch(driver, wait):
     """Click the Fetch button and wait for results."""
     try:
-        fetch_btn = driver.find_element(By.XPATH, "//input[@value='Fetch' or contains(@value,'Fetch')]")
-        fetch_btn.click()
+        fetch_btn = driver.find_element(*FETCH_BTN)
+        click_and_wait_for_results(driver, wait, fetch_btn)
         print("  ✓ Clicked Fetch")
-        time.sleep(dashboard_state.delay_medium)
-        try:
-            wait.until(EC.presence_of_element_located(
-                (By.XPATH, "//*[contains(text(), 'Displaying')]")
-            ))
-        except TimeoutException:
-            time.sleep(dashboard_state.delay_medium)
         return True
     except NoSuchElementException:
         print("  ✗ Could not find Fetch button!")
@@ -434,18 +885,14 @@ def click_fetch(driver, wait):
 
 def get_display_text(driver):
     """Get the raw 'Displaying X - Y of Z result(s)' text."""
-    try:
-        el = driver.find_element(By.XPATH, "//*[contains(text(), 'Displaying')]")
-        return el.text.strip()
-    except NoSuchElementException:
-        return None
+    return get_pagination_state(driver)["display"]
 
 
 def parse_display_count(text):
     """Parse 'Displaying 1 - 7 of 7 results' → (1, 7, 7)."""
     if not text:
         return None
-    m = re.search(r'Displaying\s+(\d+)\s*-\s*(\d+)\s+of\s+(\d+)', text)
+    m = _DISPLAY_RE.search(text)
     if m:
         return int(m.group(1)), int(m.group(2)), int(m.group(3))
     return None
@@ -453,160 +900,285 @@ def parse_display_count(text):
 
 # ── Pagination helpers (targets pagination area, NOT column headers) ──
 
-def find_next_page_button(driver):
-    """Find the '>' pagination button near 'Page X of Y', not column sort links."""
-    try:
-        page_info = driver.find_element(By.XPATH,
-            "//*[contains(text(), 'Page') and contains(text(), 'of')]")
-        parent = page_info.find_element(By.XPATH, "./..")
-        try:
-            return parent.find_element(By.XPATH, ".//a[normalize-space(text())='>']")
-        except NoSuchElementException:
-            grandparent = parent.find_element(By.XPATH, "./..")
-            return grandparent.find_element(By.XPATH, ".//a[normalize-space(text())='>']")
-    except NoSuchElementException:
-        return None
+# Runs in the page: finds the 'Displaying ...' and 'Page X of Y' elements and the
+# '<' / '>' links next to the page info (parent, then grandparent — never the
+# column sort links), so one round-trip replaces several XPath scans.
+PAGINATION_STATE_JS = """
+function first(xp) {
+    return document.evaluate(xp, document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function pagerLink(pageEl, label) {
+    let scope = pageEl ? pageEl.parentElement : null;
+    for (let i = 0; i < 2 && scope; i++, scope = scope.parentElement) {
+        for (const a of scope.querySelectorAll('a')) {
+            if (a.textContent.trim() === label) return a;
+        }
+    }
+    return null;
+}
+const display = first("//*[contains(text(), 'Displaying')]");
+const page = first("//*[contains(text(), 'Page') and contains(text(), 'of')]");
+return {
+    display: display ? display.innerText.trim() : null,
+    page: page ? page.innerText.trim() : null,
+    next: pagerLink(page, '>'),
+    prev: pagerLink(page, '<'),
+};
+"""
 
 
-def find_prev_page_button(driver):
-    """Find the '<' pagination button in the pagination area."""
+def get_pagination_state(driver):
+    """
+    Read the display text, the 'Page X of Y' text and the '>' / '<' links in a
+    single execute_script call. Missing pieces come back as None.
+    """
     try:
-        page_info = driver.find_element(By.XPATH,
-            "//*[contains(text(), 'Page') and contains(text(), 'of')]")
-        parent = page_info.find_element(By.XPATH, "./..")
-        try:
-            return parent.find_element(By.XPATH, ".//a[normalize-space(text())='<']")
-        except NoSuchElementException:
-            grandparent = parent.find_element(By.XPATH, "./..")
-            return grandparent.find_element(By.XPATH, ".//a[normalize-space(text())='<']")
-    except NoSuchElementException:
-        return None
+        state = driver.execute_script(PAGINATION_STATE_JS)
+    except Exception:
+        state = None
+    return state or {"display": None, "page": None, "next": None, "prev": None}
+
+
+def total_pages_from_state(state):
+    """Parse 'Page 1 of 16' from a pagination state and return total pages."""
+    m = _PAGE_RE.search(state.get("page") or "")
+    return int(m.group(1)) if m else 1
 
 
 def go_to_page_1(driver):
     """Navigate back to page 1 (capped at 10 clicks to prevent runaway loop)."""
     for _ in range(10):
-        prev_btn = find_prev_page_button(driver)
+        state = get_pagination_state(driver)
+        prev_btn = state["prev"]
         if prev_btn:
             try:
                 prev_btn.click()
-                time.sleep(dashboard_state.delay_medium)
+                wait_for_display_change(driver, state["display"])
             except Exception:
                 # Transient error (stale element, etc.) — re-find and retry
                 continue
         else:
-            break  # No prev button means we are on page 1
-    # Fallback: Go to Page input
+            return  # No prev button means we are on page 1
+    # Fallback (still not on page 1 after 10 clicks): Go to Page input
     try:
-        page_input = driver.find_element(By.XPATH,
-            "//input[@type='text' and (contains(@name,'page') or contains(@title,'Page'))]")
+        old_display = get_display_text(driver)
+        page_input = driver.find_element(*PAGE_INPUT)
         page_input.clear()
         page_input.send_keys("1")
-        go_btn = driver.find_element(By.XPATH, "//input[@value='Go']")
+        go_btn = driver.find_element(*GO_BTN)
         go_btn.click()
-        time.sleep(dashboard_state.delay_medium)
+        wait_for_display_change(driver, old_display)
     except NoSuchElementException:
         pass
 
 
-def get_total_pages(driver):
-    """Parse 'Page 1 of 16' and return total pages."""
+def walk_pages(driver, expected_count=0, total_pages=None):
+    """
+    Yield once per results page (1, 2, ...), clicking Next in between, then return
+    to page 1 so Save runs in the right page context. total_pages is worked out by
+    the caller from the site's result count when it has one; otherwise pagination
+    is skipped when expected_count fits on one page and read from 'Page X of N'.
+    """
+    yield 1
+    if total_pages is None and expected_count <= PAGE_SIZE:
+        return
+    if total_pages is not None and total_pages <= 1:
+        return
+    state = get_pagination_state(driver)
+    if total_pages is None:
+        total_pages = total_pages_from_state(state)
     try:
-        el = driver.find_element(By.XPATH,
-            "//*[contains(text(), 'Page') and contains(text(), 'of')]")
-        m = re.search(r'Page\s+\d+\s+of\s+(\d+)', el.text.strip())
-        if m:
-            return int(m.group(1))
-    except NoSuchElementException:
-        pass
-    return 1
+        for page in range(2, total_pages + 1):
+            next_btn = state["next"]
+            if not next_btn:
+                break
+            next_btn.click()
+            wait_for_display_change(driver, state["display"])
+            yield page
+            state = get_pagination_state(driver)
+    finally:
+        if total_pages > 1:
+            go_to_page_1(driver)
 
 
 # ── Due date validation ──
 
-def validate_due_dates_on_page(driver):
-    """Check due dates on current page. Returns list of (account_no, due_date) for bad rows."""
-    bad_rows = []
-    rows = driver.find_elements(By.XPATH, "//table//tr[td]")
-    for row in rows:
-        cells = row.find_elements(By.TAG_NAME, "td")
-        if len(cells) >= 6:
-            account_no = cells[1].text.strip()
-            due_date = cells[5].text.strip()
-            if due_date and CURRENT_MONTH_ABBR not in due_date:
-                bad_rows.append((account_no, due_date))
-    return bad_rows
-
-
-def validate_due_dates_all_pages(driver, expected_count=0):
-    """Validate due dates across all pages, then return to page 1.
-    Skips pagination entirely when expected_count <= 10 (single page)."""
-    all_bad = []
-
-    all_bad.extend(validate_due_dates_on_page(driver))
-
-    # Only paginate if there are more than 10 accounts (i.e. multiple pages)
-    if expected_count > 10:
-        total_pages = get_total_pages(driver)
-        for _ in range(total_pages - 1):
-            next_btn = find_next_page_button(driver)
-            if next_btn:
-                next_btn.click()
-                time.sleep(dashboard_state.delay_medium)
-                all_bad.extend(validate_due_dates_on_page(driver))
-            else:
-                break
+# Runs in the page: returns [account_no, due_date] for every table row with 6+ cells
+READ_DUE_DATES_JS = """
+const out = [];
+document.querySelectorAll('table tr').forEach(r => {
+    const c = r.querySelectorAll('td');
+    if (c.length >= 6) out.push([c[1].innerText.trim(), c[5].innerText.trim()]);
+});
+return out;
+"""
 
-        if total_pages > 1:
-            go_to_page_1(driver)
 
-    return all_bad
+def validate_due_dates_on_page(driver, expected_month=CURRENT_MONTH_ABBR):
+    """Check due dates on current page. Returns list of (account_no, due_date) for bad rows."""
+    rows = driver.execute_script(READ_DUE_DATES_JS) or []
+    # Compare the parsed month token by equality; a date with no month token is bad too
+    return [(acct, due) for acct, due in rows
+            if due and ((m := _MONTH_RE.search(due)) is None or m.group(1) != expected_month)]
 
 
 # ── Checkbox selection ──
 
+# Runs in the page: clicks the header "select all" checkbox (<th>) if there is one,
+# then clicks any data-row checkbox (<td>) it did not reach, so the portal's own
+# onclick handlers fire. Returns how many data-row boxes ended up checked.
+SELECT_ALL_CHECKBOXES_JS = """
+const header = document.querySelector(arguments[1]);
+if (header && !header.checked) {
+    try { header.click(); } catch (e) { /* fall through to per-row clicks */ }
+}
+const boxes = document.querySelectorAll(arguments[0]);
+let n = 0;
+for (const cb of boxes) {
+    try {
+        if (!cb.checked) { cb.click(); }
+    } catch (e) { /* leave it for the selection check */ }
+    if (cb.checked) n++;
+}
+return n;
+"""
+
+
 def select_all_checkboxes_on_page(driver):
-    """Select all checkboxes in data rows (inside <td>, not <th>)."""
-    checkboxes = driver.find_elements(By.XPATH, "//table//td//input[@type='checkbox']")
-    selected = 0
-    for cb in checkboxes:
-        try:
-            if not cb.is_selected():
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", cb)
-                time.sleep(dashboard_state.delay_checkbox)
-                cb.click()
-                time.sleep(dashboard_state.delay_checkbox)
-            selected += 1
-        except Exception as e:
-            print(f"    ⚠ Could not click a checkbox: {e}")
+    """Select all data-row checkboxes (header select-all first) with one in-page script call."""
+    try:
+        selected = driver.execute_script(SELECT_ALL_CHECKBOXES_JS,
+                                         DATA_CHECKBOX_CSS, HEADER_CHECKBOX_CSS) or 0
+    except Exception as e:
+        print(f"    ⚠ Could not click checkboxes: {e}")
+        return 0
+    # click() runs each onclick handler synchronously, so there is nothing to wait for
     print(f"    ✓ Selected {selected} checkboxes on this page")
     return selected
 
 
-def select_all_checkboxes_all_pages(driver, expected_count=0):
-    """Select checkboxes across all pages, returns total selected.
-    Skips pagination entirely when expected_count <= 10 (single page)."""
+def validate_and_select_all_pages(driver, expected_count=0, expected_month=CURRENT_MONTH_ABBR,
+                                  total_pages=None):
+    """
+    Validate due dates (against expected_month, computed once at start-up) on every
+    page, then select checkboxes only if none is bad. The portal keeps the selection
+    across pages, so a LOT that fails validation never has a single box checked.
+    A one-page LOT is selected on the same visit; longer LOTs take a second walk.
+    Returns (bad_rows, total_selected).
+    """
+    bad_rows = []
+    pages = 0
+    for _ in walk_pages(driver, expected_count, total_pages):
+        bad_rows.extend(validate_due_dates_on_page(driver, expected_month))
+        pages += 1
+    if bad_rows:
+        return bad_rows, 0
+    if pages == 1:
+        return bad_rows, select_all_checkboxes_on_page(driver)  # Still on that page
     total_selected = 0
+    for _ in walk_pages(driver, expected_count, pages):
+        total_selected += select_all_checkboxes_on_page(driver)
+    return bad_rows, total_selected
 
-    total_selected += select_all_checkboxes_on_page(driver)
-
-    # Only paginate if there are more than 10 accounts (i.e. multiple pages)
-    if expected_count > 10:
-        total_pages = get_total_pages(driver)
-        for _ in range(total_pages - 1):
-            next_btn = find_next_page_button(driver)
-            if next_btn:
-                next_btn.click()
-                time.sleep(dashboard_state.delay_medium)
-                total_selected += select_all_checkboxes_on_page(driver)
-            else:
-                break
 
-        # Return to page 1 so Save button is in the correct page context
-        if total_pages > 1:
-            go_to_page_1(driver)
+# ── Post-click waits ──
+# Each click waits for the DOM condition the next step depends on; the dashboard
+# delays are only slept as a fallback when that condition never shows up.
+
+def wait_ready(wait, condition, fallback_sleep=0):
+    """
+    wait.until(condition); on timeout sleep fallback_sleep instead.
+    Returns the condition's result, or None if it timed out.
+    """
+    try:
+        return wait.until(condition)
+    except TimeoutException:
+        time.sleep(fallback_sleep)
+        return None
+
+
+_waits = {}  # (driver, timeout) → WebDriverWait, shared by every helper
+
+
+def session_wait(driver, timeout=WAIT_TIMEOUT):
+    """The session's WebDriverWait for this timeout, built once and then reused."""
+    key = (driver, timeout)
+    if key not in _waits:
+        _waits[key] = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL)
+    return _waits[key]
+
+
+def wait_until(driver, condition, fallback_sleep=0, timeout=WAIT_TIMEOUT):
+    """wait_ready() for helpers that are only handed the driver."""
+    return wait_ready(session_wait(driver, timeout), condition, fallback_sleep)
+
+
+def results_replaced(old_results, old_text):
+    """Wait condition: the old 'Displaying' element is gone or its text has changed."""
+    def condition(driver):
+        try:
+            return old_results.text != old_text
+        except StaleElementReferenceException:
+            return True
+    return condition
 
-    return total_selected
+
+def click_and_wait_for_results(driver, wait, button):
+    """Click a button that reloads the results table, then wait for the new 'Displaying' line."""
+    old_results = first_present(driver, DISPLAYING)
+    old_text = old_results.text if old_results is not None else None
+    button.click()
+    if old_results is not None:
+        # The old results are still on screen until the page reloads them or updates
+        # them in place; identical new results show neither, hence the short timeout
+        wait_until(driver, results_replaced(old_results, old_text), timeout=RESULTS_SWAP_TIMEOUT)
+    wait_ready(wait, results_loaded, dashboard_state.delay_medium)
+
+
+def results_loaded(driver):
+    """
+    Wait condition: the page has finished loading and shows a 'Displaying' line.
+    document.readyState is a cheap check, so the whole-page DISPLAYING XPath only
+    runs once the new page is complete rather than on every poll while it loads.
+    """
+    if driver.execute_script("return document.readyState") != "complete":
+        return False
+    return first_present(driver, DISPLAYING) or False
+
+
+def wait_for_display_change(driver, old_text, timeout=WAIT_TIMEOUT):
+    """
+    Wait until the 'Displaying X - Y of Z' text differs from old_text, i.e. another
+    results page has rendered. Falls back to the medium delay if old_text is unknown
+    or the text never changes. Returns whether the change was seen.
+    """
+    if old_text:
+        try:
+            session_wait(driver, timeout).until(
+                lambda d: (get_display_text(d) or old_text) != old_text)
+            return True
+        except TimeoutException:
+            pass
+    time.sleep(dashboard_state.delay_medium)
+    return False
+
+
+def wait_for_element_or_alert(driver, locator, timeout=WAIT_TIMEOUT):
+    """
+    Poll until the element at locator is present, accepting any alert that
+    pops up on the way. Returns True once the element is found, False on timeout.
+    """
+    def element_accepting_alerts(d):
+        try:
+            alert = d.switch_to.alert
+        except NoAlertPresentException:
+            return first_present(d, locator) is not None
+        print(f"    Alert: {alert.text}")
+        alert.accept()
+        return False  # Alert handled — keep waiting for the element itself
+
+    return wait_until(driver, element_accepting_alerts, timeout=timeout) is not None
 
 
 # ── Save ──
@@ -614,21 +1186,15 @@ def select_all_checkboxes_all_pages(driver, expected_count=0):
 def click_save(driver, wait):
     """Click the Save button on the Deposit Accounts page."""
     try:
-        save_btn = driver.find_element(By.XPATH, "//input[@value='Save' or contains(@value,'Save')]")
+        save_btn = driver.find_element(*SAVE_BTN)
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", save_btn)
-        time.sleep(dashboard_state.delay_short)
+        wait_ready(wait, SAVE_BTN_CLICKABLE, dashboard_state.delay_short)
         save_btn.click()
         print("  ✓ Clicked Save")
-        time.sleep(dashboard_state.delay_long)
 
-        # Handle any confirmation alert
-        try:
-            alert = driver.switch_to.alert
-            print(f"    Alert: {alert.text}")
-            alert.accept()
-            time.sleep(dashboard_state.delay_medium)
-        except Exception:
-            pass
+        # Accept any confirmation alert, then wait for the saved list page
+        if not wait_for_element_or_alert(driver, SAVED_LIST):
+            time.sleep(dashboard_state.delay_long)
 
         return True
     except NoSuchElementException:
@@ -638,6 +1204,30 @@ def click_save(driver, wait):
 
 # ── Pay All Saved Installments + Reference Number capture ──
 
+def read_payment_reference(driver):
+    """
+    Read the page text once and pull the payment reference out of it.
+    Returns (message line, reference_id); either is "" when not found. The loose
+    fallback pattern is only tried on lines that mention a payment or reference,
+    so stray codes elsewhere on the page are not mistaken for one.
+    """
+    try:
+        body_text = driver.execute_script("return document.body.innerText;") or ""
+    except Exception:
+        return "", ""
+    m = _REF_RE.search(body_text)
+    lines = [line.strip() for line in body_text.splitlines()
+             if "reference" in line.lower() or "payment successful" in line.lower()]
+    msg_text = lines[0] if lines else ""
+    if m:
+        return msg_text, m.group(1)
+    for line in lines:
+        m = _REF_FALLBACK_RE.search(line)
+        if m:
+            return line, m.group(1)
+    return msg_text, ""
+
+
 def click_pay_and_get_reference(driver, wait):
     """
     On the 'Selected Recurring Deposit Account List' page:
@@ -647,119 +1237,76 @@ def click_pay_and_get_reference(driver, wait):
     """
     # Wait for the saved list page
     try:
-        wait.until(EC.presence_of_element_located(
-            (By.XPATH, "//*[contains(text(), 'Selected Recurring Deposit Account List')]")
-        ))
+        wait.until(SAVED_LIST_SHOWN)
         print("  ✓ On 'Selected Recurring Deposit Account List' page")
     except TimeoutException:
         print("  ⚠ Could not confirm saved list page, trying anyway...")
 
-    time.sleep(dashboard_state.delay_short)
-
     # Click "Pay All Saved Installments"
     try:
-        pay_btn = driver.find_element(By.XPATH,
-            "//input[@value='Pay All Saved Installments' or contains(@value,'Pay All Saved')]")
+        pay_btn = driver.find_element(*PAY_ALL_BTN)
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", pay_btn)
-        time.sleep(dashboard_state.delay_short)
+        wait_ready(wait, PAY_ALL_BTN_CLICKABLE, dashboard_state.delay_short)
         pay_btn.click()
         print("  ✓ Clicked 'Pay All Saved Installments'")
-        time.sleep(dashboard_state.delay_long)
-
-        # Handle any confirmation alert
-        try:
-            alert = driver.switch_to.alert
-            print(f"    Alert: {alert.text}")
-            alert.accept()
-            time.sleep(dashboard_state.delay_medium)
-        except Exception:
-            pass
-
     except NoSuchElementException:
         print("  ✗ Could not find 'Pay All Saved Installments' button!")
         return False, ""
 
-    # Wait for success message and extract reference number
+    # Accept any confirmation alert, then wait for the success message
     # Message: "Payment successful. Your payment reference number is C320461082."
-    time.sleep(dashboard_state.delay_medium)
-    reference_id = ""
-    try:
-        success_el = driver.find_element(By.XPATH,
-            "//*[contains(text(), 'Payment successful') or contains(text(), 'payment reference')]")
-        msg_text = success_el.text.strip()
-        print(f"  ✓ {msg_text}")
+    if not wait_for_element_or_alert(driver, PAY_RESULT):
+        time.sleep(dashboard_state.delay_medium)
 
-        # Extract reference number
-        m = re.search(r'reference\s+number\s+is\s+([A-Za-z0-9]+)', msg_text)
-        if m:
-            reference_id = m.group(1)
-            print(f"  ✓ Reference ID captured: {reference_id}")
-        else:
-            # Try broader pattern (e.g. "C320461082" standalone)
-            m = re.search(r'([A-Z]\d{6,})', msg_text)
-            if m:
-                reference_id = m.group(1)
-                print(f"  ✓ Reference ID captured: {reference_id}")
-            else:
-                print(f"  ⚠ Could not parse reference ID from: '{msg_text}'")
-                # Auto-pause so the user can read the page and enter via dashboard log
-                with dashboard_state.lock:
-                    dashboard_state.is_paused = True
-                    dashboard_state.current_step = "PAUSED: Could not parse Reference ID — check portal, then Resume"
-                control_flags.pause_event.clear()
-                control_flags.pause_event.wait()
-                # After resume, try one more scrape of the page
-                try:
-                    el2 = driver.find_element(By.XPATH,
-                        "//*[contains(text(), 'reference number') or contains(text(), 'Reference')]")
-                    m2 = re.search(r'([A-Z]\d{6,})', el2.text)
-                    reference_id = m2.group(1) if m2 else ""
-                    if reference_id:
-                        print(f"  ✓ Reference ID captured after resume: {reference_id}")
-                    else:
-                        print(f"  ⚠ Still could not parse reference ID — Pay_Status will be FAIL")
-                        return False, ""
-                except Exception:
-                    print(f"  ⚠ Reference ID not found — Pay_Status will be FAIL")
-                    return False, ""
-    except NoSuchElementException:
-        print("  ⚠ Could not find success message on page")
-        # Targeted fallback: search for any element mentioning 'reference'
-        try:
-            ref_el = driver.find_element(By.XPATH,
-                "//*[contains(text(), 'reference number') or contains(text(), 'Reference')]")
-            ref_text = ref_el.text.strip()
-            m = re.search(r'reference\s+number\s+is\s+([A-Za-z0-9]+)', ref_text)
-            if m:
-                reference_id = m.group(1)
-                print(f"  ✓ Reference ID from page: {reference_id}")
-            else:
-                m = re.search(r'([A-Z]\d{6,})', ref_text)
-                if m:
-                    reference_id = m.group(1)
-                    print(f"  ✓ Reference ID from page: {reference_id}")
-                else:
-                    print(f"  ⚠ Reference ID not found in fallback element — Pay_Status will be FAIL")
-                    return False, ""
-        except Exception:
-            print(f"  ⚠ No success or reference element found on page — Pay_Status will be FAIL")
+    msg_text, reference_id = read_payment_reference(driver)
+    if msg_text:
+        print(f"  ✓ {msg_text}")
+    if not reference_id:
+        print(f"  ⚠ Could not parse reference ID from: '{msg_text}'")
+        # Auto-pause so the user can read the page and enter via dashboard log
+        control_flags.pause()
+        with dashboard_state.lock:
+            dashboard_state.is_paused = True
+            dashboard_state.current_step = "PAUSED: Could not parse Reference ID — check portal, then Resume"
+        control_flags.wait_until_running()
+        # Payment is already submitted, so a Skip here only ends the pause;
+        # consume it so it does not skip the next LOT
+        control_flags.take_skip()
+        # After resume, try one more read of the page
+        _, reference_id = read_payment_reference(driver)
+        if not reference_id:
+            print(f"  ⚠ Still could not parse reference ID — Pay_Status will be FAIL")
             return False, ""
+        print(f"  ✓ Reference ID captured after resume: {reference_id}")
+    else:
+        print(f"  ✓ Reference ID captured: {reference_id}")
 
     return True, reference_id
 
 
 # ── Phase 2: Reports → Download PDFs ──
 
+def lot_pdf_name(lot_data):
+    """File name a LOT's report PDF is saved under: LOT#_RefID.pdf."""
+    return f"{lot_data.LOT}_{lot_data.Reference_ID}.pdf"
+
+
+def list_downloaded_pdfs(download_dir):
+    """Names of the PDFs already in download_dir, from a single directory scan."""
+    try:
+        with os.scandir(download_dir) as entries:
+            return {e.name for e in entries if e.name.endswith(".pdf") and e.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
 def navigate_to_reports(driver, wait):
     """Click 'Reports' in the left sidebar to go to Recurring Deposit Installment Report."""
     try:
-        reports_link = driver.find_element(By.XPATH, "//a[contains(text(), 'Reports')]")
+        reports_link = driver.find_element(*REPORTS_LINK)
         reports_link.click()
-        time.sleep(dashboard_state.delay_medium)
         # Verify we're on the reports page
-        wait.until(EC.presence_of_element_located(
-            (By.XPATH, "//*[contains(text(), 'RECURRING DEPOSIT INSTALLMENT REPORT')]")
-        ))
+        wait.until(REPORTS_HEADING_SHOWN)
         print("✓ On Recurring Deposit Installment Report page")
         return True
     except (NoSuchElementException, TimeoutException):
@@ -768,34 +1315,70 @@ def navigate_to_reports(driver, wait):
         return True
 
 
-def find_reference_input(driver):
-    """Locate the 'List Reference No' input field on the Reports page."""
-    # Try by name attribute
-    try:
-        return driver.find_element(By.XPATH,
-            "//input[contains(@name, 'referenceNo') or contains(@name, 'Reference') or contains(@name, 'listRef')]")
-    except NoSuchElementException:
-        pass
-    # Try by label proximity
+_ref_input_locator = None  # By.ID / By.NAME locator of the reference field found last time
+
+
+def _stable_locator(element):
+    """A direct (By.ID or By.NAME) locator for element, or None if it has neither."""
+    for by, attr in ((By.ID, "id"), (By.NAME, "name")):
+        value = element.get_attribute(attr)
+        if value:
+            return (by, value)
+    return None
+
+
+# Runs in the page: the reference input by name attribute, else the text input next
+# to the 'List Reference No' label — both tried, in that order, in one call
+FIND_REF_INPUT_JS = """
+const first = (xpath, ctx) => document.evaluate(xpath, ctx || document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const byName = first(arguments[0]);
+if (byName) return byName;
+const label = first(arguments[1]);
+return label ? first(arguments[2], label) : null;
+"""
+
+
+def _search_reference_input(driver):
+    """Search the Reports page for the 'List Reference No' input field."""
+    # By name attribute, then by label proximity
     try:
-        label = driver.find_element(By.XPATH, "//*[contains(text(), 'List Reference No')]")
-        parent = label.find_element(By.XPATH, "./..")
-        return parent.find_element(By.XPATH, ".//input[@type='text']")
-    except NoSuchElementException:
-        pass
+        ref_input = driver.execute_script(FIND_REF_INPUT_JS, REPORT_REF_INPUT[1],
+                                          REPORT_REF_LABEL[1], LABEL_SIBLING_INPUT[1])
+    except Exception:
+        ref_input = None
+    if ref_input:
+        return ref_input
     # Last resort: find all text inputs, skip date and cheque fields
-    inputs = driver.find_elements(By.XPATH, "//input[@type='text']")
+    inputs = driver.find_elements(*TEXT_INPUT)
     for inp in inputs:
-        val = inp.get_attribute("value") or ""
+        # Name check first: it rules most fields out without reading their value
         name = (inp.get_attribute("name") or "").lower()
-        if "date" in name or re.match(r'\d{2}-\w{3}-\d{4}', val):
+        if "date" in name or "cheque" in name:
             continue
-        if "cheque" in name:
+        if _DATE_VALUE_RE.match(inp.get_attribute("value") or ""):
             continue
         return inp
     return None
 
 
+def find_reference_input(driver):
+    """
+    Locate the 'List Reference No' input field on the Reports page. The field's id or
+    name is remembered after the first search, so later LOTs find it with one direct
+    lookup (the page reloads on every Search, so the element itself cannot be kept).
+    """
+    global _ref_input_locator
+    if _ref_input_locator:
+        ref_input = first_present(driver, _ref_input_locator)
+        if ref_input:
+            return ref_input
+    ref_input = _search_reference_input(driver)
+    if ref_input:
+        _ref_input_locator = _stable_locator(ref_input)
+    return ref_input
+
+
 def search_by_reference(driver, wait, reference_id):
     """Clear old reference, type new one, and click Search."""
     ref_input = find_reference_input(driver)
@@ -803,91 +1386,206 @@ def search_by_reference(driver, wait, reference_id):
         print(f"  ✗ Could not find List Reference No input!")
         return False
 
-    # Clear old value manually (select all + delete) — avoids clicking Clear button
-    ref_input.click()
-    time.sleep(dashboard_state.delay_checkbox)
-    ref_input.send_keys(SELECT_ALL_KEY, "a")
-    time.sleep(dashboard_state.delay_checkbox)
-    ref_input.send_keys(Keys.DELETE)
-    time.sleep(dashboard_state.delay_checkbox)
-
-    # Type new reference ID
-    ref_input.send_keys(reference_id)
-    time.sleep(dashboard_state.delay_short)
+    # Overwrite the old value in place — avoids clicking Clear button (resets the dates)
+    if not driver.execute_script(SET_FIELD_VALUE_JS, ref_input, reference_id):
+        # Fallback: select all + delete, then type
+        type_over(driver, ref_input, reference_id)
     print(f"  ✓ Entered reference: {reference_id}")
 
-    # Click Search
+    # Click Search and wait for the new results
     try:
-        search_btn = driver.find_element(By.XPATH, "//input[@value='Search']")
-        search_btn.click()
+        search_btn = driver.find_element(*SEARCH_BTN)
+        click_and_wait_for_results(driver, wait, search_btn)
         print(f"  ✓ Clicked Search")
-        time.sleep(dashboard_state.delay_medium)
-        # Wait for results
-        try:
-            wait.until(EC.presence_of_element_located(
-                (By.XPATH, "//*[contains(text(), 'Displaying')]")
-            ))
-        except TimeoutException:
-            time.sleep(dashboard_state.delay_medium)
         return True
     except NoSuchElementException:
         print(f"  ✗ Could not find Search button!")
         return False
 
 
-def wait_for_download(download_dir, timeout=30):
+DOWNLOAD_SETTLE_SECS = 0.2  # Size must hold steady this long before a PDF counts as done
+DOWNLOAD_POLL_MAX = 1.6  # Longest gap between folder scans when polling (no watchdog)
+
+
+def _new_finished_pdf(download_dir, existing=()):
+    """
+    The newest PDF in download_dir whose name is not in existing, once no .crdownload
+    is left and its size has stopped changing; None if there is none yet.
+    """
+    latest, latest_stat = None, None
+    try:
+        # One directory scan for both the partial downloads and the newest new PDF
+        with os.scandir(download_dir) as entries:
+            for e in entries:
+                if e.name.endswith(".crdownload"):
+                    return None  # Chrome is still writing
+                if e.name.endswith(".pdf") and e.name not in existing:
+                    st = e.stat()
+                    if latest is None or st.st_mtime > latest_stat.st_mtime:
+                        latest, latest_stat = e.path, st
+    except OSError:
+        return None  # Folder not created yet, or a file vanished mid-scan
+    if latest:
+        try:
+            # Confirm size is stable (not still being flushed to disk). Chrome only
+            # renames .crdownload once the file is complete, so a short check is enough.
+            time.sleep(DOWNLOAD_SETTLE_SECS)
+            size = os.path.getsize(latest)
+            if size == latest_stat.st_size and size > 0:
+                return latest
+        except OSError:
+            pass  # File disappeared — keep waiting
+    return None
+
+
+def wait_for_download(download_dir, timeout=30, existing=()):
     """
-    Wait for a new PDF to finish downloading in download_dir.
+    Wait for a new PDF (name not in existing) to finish downloading in download_dir.
     Returns the path to the downloaded file, or None on timeout.
     Waits for: (1) .crdownload to disappear, (2) file size to stabilise.
+    Uses a watchdog filesystem observer so the folder is only re-checked when it
+    changes; falls back to polling if watchdog is not installed.
     """
-    end_time = time.time() + timeout
-    while time.time() < end_time:
-        crdownloads = glob_mod.glob(os.path.join(download_dir, "*.crdownload"))
-        files = glob_mod.glob(os.path.join(download_dir, "*.pdf"))
-
-        if files and not crdownloads:
-            latest = max(files, key=os.path.getmtime)
-            # Confirm size is stable (not still being flushed to disk)
-            try:
-                size1 = os.path.getsize(latest)
-                time.sleep(0.5)
-                size2 = os.path.getsize(latest)
-                if size1 == size2 and size1 > 0:
-                    return latest
-            except OSError:
-                pass  # File disappeared — keep waiting
+    end_time = time.monotonic() + timeout
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        # Poll with exponential backoff: quick downloads are seen within POLL_INTERVAL,
+        # slow ones do not cost a directory scan every 100 ms
+        interval = POLL_INTERVAL
+        while time.monotonic() < end_time:
+            found = _new_finished_pdf(download_dir, existing)
+            if found:
+                return found
+            time.sleep(min(interval, max(0, end_time - time.monotonic())))
+            interval = min(interval * 2, DOWNLOAD_POLL_MAX)
+        return None
 
-        time.sleep(1)
+    changed = threading.Event()
 
-    return None
+    class _DirChanged(FileSystemEventHandler):
+        def on_any_event(self, event):
+            changed.set()
+
+    observer = Observer()
+    observer.schedule(_DirChanged(), download_dir, recursive=False)
+    observer.start()
+    try:
+        while True:
+            # Clear before checking so a change during the check is not missed
+            changed.clear()
+            found = _new_finished_pdf(download_dir, existing)
+            if found:
+                return found
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                return None
+            changed.wait(remaining)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def set_download_dir(driver, path):
+    """Point Chrome's downloads at path via DevTools. Returns whether Chrome accepted it."""
+    try:
+        os.makedirs(path, exist_ok=True)
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                               {"behavior": "allow", "downloadPath": path})
+        return True
+    except Exception as e:
+        print(f"  ⚠ Could not set download folder to {path}: {e}")
+        return False
 
 
-def download_pdf_for_lot(driver, wait, lot_data, download_dir):
+def _landing_dir(download_dir, lot):
     """
-    Search for a LOT's reference ID, verify count, and download PDF.
-    Returns True on success.
+    LOT lot's own download folder, empty. Anything an earlier attempt left there (a PDF
+    whose rename failed, a .crdownload from an aborted run) would pass for this
+    download, so a non-empty folder is moved aside to .LOT_<n>.old-<timestamp> first.
+    Returns download_dir if the leftovers cannot be moved.
     """
-    lot = lot_data["LOT"]
-    ref_id = lot_data.get("Reference_ID", "")
-    expected_count = lot_data["Count"]
+    landing_dir = os.path.join(download_dir, f".LOT_{lot}")
+    try:
+        leftovers = os.listdir(landing_dir)
+    except FileNotFoundError:
+        return landing_dir
+    if not leftovers:
+        return landing_dir
+    stale_dir = f"{landing_dir}.old-{datetime.now():%Y%m%d-%H%M%S}"
+    try:
+        os.rename(landing_dir, stale_dir)
+    except OSError as e:
+        print(f"  ⚠ LOT {lot}: Could not move leftover files out of {landing_dir}: {e}")
+        return download_dir
+    print(f"  ⚠ LOT {lot}: Moved leftover files from an earlier attempt to {stale_dir}")
+    return landing_dir
+
+
+def download_started_or_alert(download_dir, existing_pdfs):
+    """
+    Wait condition for after OK is clicked: True once a new .crdownload/.pdf appears
+    in download_dir, else the alert if one is open, else False. The folder is checked
+    first — it costs no WebDriver round-trip, so the usual case never probes for an alert.
+    """
+    def condition(driver):
+        try:
+            with os.scandir(download_dir) as entries:
+                for e in entries:
+                    if e.name.endswith(".crdownload"):
+                        return True
+                    if e.name.endswith(".pdf") and e.name not in existing_pdfs:
+                        return True
+        except FileNotFoundError:
+            pass
+        try:
+            return driver.switch_to.alert
+        except NoAlertPresentException:
+            return False
+    return condition
+
+
+# Runs in the page: selects the "PDF file" option of the download-format dropdown
+# unless it is already selected, firing change like a real pick. Returns "kept",
+# "set", or null when there is no dropdown or no PDF option.
+ENSURE_PDF_FORMAT_JS = """
+const sel = document.querySelector(arguments[0]);
+if (!sel) return null;
+const opt = Array.from(sel.options).find(
+    o => o.text.trim().toLowerCase() === 'pdf file');
+if (!opt) return null;
+if (opt.selected) return 'kept';
+sel.value = opt.value;
+sel.dispatchEvent(new Event('change', {bubbles: true}));
+return 'set';
+"""
+
+
+def request_pdf_download(driver, wait, lot_data, download_dir, existing_pdfs, before_click=None):
+    """
+    Search for a LOT's reference ID, verify count, and click OK to start the PDF download.
+    The download goes to a folder of its own (see collect_downloaded_pdf); if Chrome
+    refuses that, it lands in download_dir and existing_pdfs (PDF names already there,
+    kept up to date by run_phase2) tells the new file apart. before_click (optional) is
+    called just before OK is clicked — run_phase2 uses it to settle the previous download.
+    Returns the folder the PDF will land in, or None on failure.
+    """
+    lot = lot_data.LOT
+    ref_id = lot_data.Reference_ID
+    expected_count = lot_data.Count
 
     if not ref_id:
         print(f"  ⚠ LOT {lot}: No Reference ID, skipping download")
-        return False
+        return None
 
     print(f"\n  {'─' * 50}")
     print(f"  Downloading LOT {lot}  |  Ref: {ref_id}  |  Count: {expected_count}")
     print(f"  {'─' * 50}")
 
-    # Get existing PDF files before this download (to identify the new one)
-    existing_pdfs = set(glob_mod.glob(os.path.join(download_dir, "*.pdf")))
-
     # Search by reference
     if not search_by_reference(driver, wait, ref_id):
-        return False
-
-    time.sleep(dashboard_state.delay_short)
+        return None
 
     # Verify count
     display_text = get_display_text(driver)
@@ -902,80 +1600,93 @@ def download_pdf_for_lot(driver, wait, lot_data, download_dir):
     else:
         print(f"  ⚠ Could not read display count")
 
-    time.sleep(dashboard_state.delay_short)
-
-    # Ensure "PDF file" is selected in the dropdown
+    # Ensure "PDF file" is selected in the dropdown — find, check and set in one call
+    # (it usually already is, so nothing changes and the page is not re-rendered)
     try:
-        from selenium.webdriver.support.ui import Select
-        dropdown = driver.find_element(By.XPATH, "//select[contains(@name,'download') or contains(@name,'format')]")
-        select = Select(dropdown)
-        select.select_by_visible_text("PDF file")
-        time.sleep(0.5)
-    except (NoSuchElementException, Exception):
-        # May already be selected as PDF
+        driver.execute_script(ENSURE_PDF_FORMAT_JS, DOWNLOAD_FORMAT_SELECT[1])
+    except Exception:
+        # Dropdown re-rendered mid-call — the site's default is PDF
         pass
 
+    if before_click:
+        before_click()
+
+    # Route this LOT's download into its own folder so the file needs no identifying
+    landing_dir = _landing_dir(download_dir, lot)
+    if not set_download_dir(driver, landing_dir):
+        landing_dir = download_dir
+    baseline = existing_pdfs if landing_dir == download_dir else ()
+
     # Click OK to download
     try:
-        ok_btn = driver.find_element(By.XPATH, "//input[@value='OK']")
+        ok_btn = driver.find_element(*OK_BTN)
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", ok_btn)
-        time.sleep(dashboard_state.delay_short)
+        wait_ready(wait, OK_BTN_CLICKABLE, dashboard_state.delay_short)
         ok_btn.click()
         print(f"  ✓ Clicked OK to download PDF")
-        time.sleep(dashboard_state.delay_medium)
 
-        # Handle any alert
-        try:
-            alert = driver.switch_to.alert
-            print(f"    Alert: {alert.text}")
-            alert.accept()
-            time.sleep(dashboard_state.delay_short)
-        except Exception:
-            pass
+        # Wait until the download starts or an alert pops up — and handle the alert
+        started = wait_ready(wait, download_started_or_alert(landing_dir, baseline),
+                             dashboard_state.delay_medium)
+        if isinstance(started, Alert):
+            print(f"    Alert: {started.text}")
+            started.accept()
 
     except NoSuchElementException:
         print(f"  ✗ Could not find OK button!")
-        return False
+        return None
 
-    # Wait for the download to complete
-    print(f"  Waiting for download...")
-    time.sleep(dashboard_state.delay_medium)
+    # Do NOT click Clear button (it resets all fields including dates).
+    # The reference field will be cleared manually in search_by_reference() next time.
+
+    return landing_dir
 
-    # Find the newly downloaded file
-    new_pdfs = set(glob_mod.glob(os.path.join(download_dir, "*.pdf")))
-    new_files = new_pdfs - existing_pdfs
 
-    if not new_files:
-        # Wait a bit more for the download
-        downloaded = wait_for_download(download_dir, timeout=20)
-        if downloaded and downloaded not in existing_pdfs:
-            new_files = {downloaded}
+def collect_downloaded_pdf(lot_data, download_dir, landing_dir, existing_pdfs):
+    """
+    Wait for the PDF started by request_pdf_download() to finish in landing_dir and move
+    it to download_dir as LOT#_RefID.pdf, recording the final name in existing_pdfs.
+    Touches only the filesystem, so it can run while the browser searches the next LOT.
+    Returns True once handled.
+    """
+    lot = lot_data.LOT
+
+    # Wait for the newly downloaded file to finish writing. In the LOT's own folder
+    # any PDF is this LOT's; in the shared folder the known names are ignored.
+    baseline = existing_pdfs if landing_dir == download_dir else ()
+    downloaded_file = wait_for_download(landing_dir, existing=baseline)
 
-    if new_files:
-        downloaded_file = max(new_files, key=os.path.getmtime)
+    if downloaded_file:
         # Rename to LOT#_RefID.pdf
-        target_name = f"{lot}_{ref_id}.pdf"
+        target_name = lot_pdf_name(lot_data)
         target_path = os.path.join(download_dir, target_name)
         try:
             os.rename(downloaded_file, target_path)
-            print(f"  ✓ Saved as: {target_name}")
+            existing_pdfs.add(target_name)
+            print(f"  ✓ LOT {lot} saved as: {target_name}")
         except OSError as e:
-            print(f"  ⚠ Could not rename file: {e}")
+            existing_pdfs.add(os.path.basename(downloaded_file))
+            print(f"  ⚠ LOT {lot}: Could not rename file: {e}")
             print(f"    Downloaded to: {downloaded_file}")
     else:
-        print(f"  ⚠ Could not detect downloaded file")
-        print(f"    Check {download_dir} manually")
+        print(f"  ⚠ LOT {lot}: Could not detect downloaded file")
+        print(f"    Check {landing_dir} manually")
 
-    time.sleep(dashboard_state.delay_short)
-
-    # Do NOT click Clear button (it resets all fields including dates).
-    # The reference field will be cleared manually in search_by_reference() next time.
+    if landing_dir != download_dir:
+        try:
+            os.rmdir(landing_dir)
+        except OSError:
+            pass  # Not empty (stray file) — leave it for the user
 
     return True
 
 
 def run_phase2(driver, wait, lots, download_dir):
-    """Phase 2: Navigate to Reports and download PDFs for all completed LOTs."""
+    """
+    Phase 2: Navigate to Reports and download PDFs for all completed LOTs.
+    Each LOT's download is awaited and renamed on a background thread while the
+    browser already searches the next LOT; it is settled before the next OK click.
+    """
     print(f"\n{'=' * 60}")
     print(f"  PHASE 2: DOWNLOADING PDFs")
     print(f"  Download folder: {download_dir}")
@@ -985,35 +1696,62 @@ def run_phase2(driver, wait, lots, download_dir):
 
     # Navigate to Reports
     navigate_to_reports(driver, wait)
-    time.sleep(dashboard_state.delay_short)
 
+    # One directory scan up front; collect_downloaded_pdf() adds each new file to it
+    on_disk = list_downloaded_pdfs(download_dir)
     download_success = 0
     download_fail = 0
+    pending = None  # (LOT, Future) of the download still being collected
 
-    for lot_data in lots:
-        ref_id = lot_data.get("Reference_ID", "")
-        if not ref_id:
-            continue  # Skip LOTs without reference IDs
-
-        # Check if already downloaded
-        target_name = f"{lot_data['LOT']}_{ref_id}.pdf"
-        target_path = os.path.join(download_dir, target_name)
-        if os.path.exists(target_path):
-            print(f"\n  LOT {lot_data['LOT']}: {target_name} already exists, skipping.")
+    def settle_pending():
+        nonlocal pending, download_success, download_fail
+        if pending is None:
+            return
+        lot, future = pending
+        pending = None
+        try:
+            ok = future.result()
+        except Exception as e:
+            print(f"\n  ✗ Error collecting PDF for LOT {lot}: {e}")
+            ok = False
+        if ok:
             download_success += 1
-            continue
+        else:
+            download_fail += 1
 
-        try:
-            result = download_pdf_for_lot(driver, wait, lot_data, download_dir)
-            if result:
+    with ThreadPoolExecutor(max_workers=1) as collector:
+        for lot_data in lots:
+            ref_id = lot_data.Reference_ID
+            if not ref_id:
+                continue  # Skip LOTs without reference IDs
+
+            # Check if already downloaded
+            target_name = lot_pdf_name(lot_data)
+            if target_name in on_disk:
+                print(f"\n  LOT {lot_data.LOT}: {target_name} already exists, skipping.")
                 download_success += 1
-            else:
+                continue
+
+            try:
+                landing_dir = request_pdf_download(driver, wait, lot_data, download_dir, on_disk,
+                                                   before_click=settle_pending)
+                if landing_dir:
+                    pending = (lot_data.LOT,
+                               collector.submit(collect_downloaded_pdf, lot_data,
+                                                download_dir, landing_dir, on_disk))
+                else:
+                    download_fail += 1
+            except Exception as e:
+                print(f"\n  ✗ Error downloading LOT {lot_data.LOT}: {e}")
                 download_fail += 1
-        except Exception as e:
-            print(f"\n  ✗ Error downloading LOT {lot_data['LOT']}: {e}")
-            download_fail += 1
 
-        time.sleep(dashboard_state.delay_long)
+            time.sleep(dashboard_state.delay_long)
+
+        print(f"\n  Waiting for last download...")
+        settle_pending()
+
+    # Manual downloads in the still-open browser should land in the main folder again
+    set_download_dir(driver, download_dir)
 
     print(f"\n  Phase 2 Summary: {download_success} downloaded, {download_fail} failed")
     print(f"  Files in: {download_dir}")
@@ -1023,23 +1761,43 @@ def run_phase2(driver, wait, lots, download_dir):
 
 def _format_lot_range(lot_numbers):
     """Format LOT numbers as compact range string. e.g. [1,2,3,5,7,8,9] → '1-3,5,7-9'."""
-    if not lot_numbers:
-        return ""
-    nums = sorted(lot_numbers)
     ranges = []
-    start = nums[0]
-    prev = nums[0]
-    for n in nums[1:]:
-        if n == prev + 1:
-            prev = n
-        else:
-            ranges.append(f"{start}-{prev}" if start != prev else str(start))
-            start = n
-            prev = n
-    ranges.append(f"{start}-{prev}" if start != prev else str(start))
+    # Consecutive numbers share the same (number - position) key, so each group is one run
+    for _, run in groupby(enumerate(sorted(set(lot_numbers))), key=lambda t: t[1] - t[0]):
+        run = [n for _, n in run]
+        ranges.append(f"{run[0]}-{run[-1]}" if len(run) > 1 else str(run[0]))
     return ",".join(ranges)
 
 
+def _format_lot_list(lot_nums, sep=","):
+    """LOT numbers as a compact range when all are numeric, else listed with sep."""
+    if all(isinstance(n, int) for n in lot_nums):
+        return _format_lot_range(lot_nums)
+    return sep.join(str(n) for n in lot_nums)
+
+
+def _merged_filename(lot_nums):
+    """Merged PDF name for the given LOT numbers, e.g. Merged_1-3,5.pdf."""
+    return f"Merged_{_format_lot_list(lot_nums)}.pdf"
+
+
+def _page_count(path):
+    """
+    Number of pages in a PDF, read from the page tree's /Count rather than by
+    building every page object. Uses pikepdf when installed, pypdf otherwise.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        pikepdf = None
+    if pikepdf is not None:
+        with pikepdf.open(path) as pdf:
+            return len(pdf.pages)
+    from pypdf import PdfReader
+    with open(path, "rb") as fh:
+        return int(PdfReader(fh).trailer["/Root"]["/Pages"]["/Count"])
+
+
 def merge_single_page_pdfs(download_dir, lots):
     """Merge only single-page PDFs into one file. Multi-page PDFs are skipped."""
     try:
@@ -1052,67 +1810,104 @@ def merge_single_page_pdfs(download_dir, lots):
     print(f"  PHASE 3: MERGING SINGLE-PAGE PDFs")
     print(f"{'=' * 60}")
 
-    # Collect LOT PDFs that exist on disk
-    merged_lots = []
-    skipped_lots = []
-    writer = PdfWriter()
-
+    # Collect LOT PDFs that exist on disk (one directory scan, then set lookups)
+    on_disk = list_downloaded_pdfs(download_dir)
+    candidates = []  # (lot_num, path) — lot_num is an int for numeric LOTs, parsed once here
     for lot_data in lots:
-        ref_id = lot_data.get("Reference_ID", "")
-        if not ref_id:
+        if not lot_data.Reference_ID:
             continue
-        lot_num = lot_data["LOT"]
-        target_name = f"{lot_num}_{ref_id}.pdf"
-        target_path = os.path.join(download_dir, target_name)
+        target_name = lot_pdf_name(lot_data)
+        if target_name in on_disk:
+            lot = lot_data.LOT
+            candidates.append((int(lot) if lot.isdigit() else lot,
+                               os.path.join(download_dir, target_name)))
+
+    # Re-run after a full merge: the output already covers every LOT PDF on disk
+    if len(candidates) >= 2:
+        merged_filename = _merged_filename([lot_num for lot_num, _ in candidates])
+        if merged_filename in on_disk:
+            print(f"\n  {merged_filename} already exists, skipping merge.")
+            return
 
-        if not os.path.exists(target_path):
-            continue
+    # Page counts only need the page tree root and are I/O-bound, so probe them in
+    # parallel (results come back in LOT order); full readers are built for 1-page files only
+    def probe(path):
+        try:
+            return _page_count(path)
+        except Exception as e:
+            return e
 
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        page_counts = list(pool.map(probe, [path for _, path in candidates]))
+
+    single_page = []  # (lot_num, path)
+    skipped_lots = []
+    for (lot_num, target_path), page_count in zip(candidates, page_counts):
+        if isinstance(page_count, Exception):
+            skipped_lots.append((lot_num, f"error: {page_count}"))
+            print(f"  ✗ LOT {lot_num}: could not read → skipped ({page_count})")
+        elif page_count != 1:
+            skipped_lots.append((lot_num, page_count))
+            print(f"  ✗ LOT {lot_num}: {page_count} pages → skipped")
+        else:
+            single_page.append((lot_num, target_path))
+
+    # The merged name is known before any page is read — skip the merge if it exists
+    if len(single_page) < 2:
+        print(f"\n  Only {len(single_page)} single-page PDF(s) found, nothing to merge.")
+        return
+    merged_filename = _merged_filename([lot_num for lot_num, _ in single_page])
+    if merged_filename in on_disk:
+        print(f"\n  {merged_filename} already exists, skipping merge.")
+        return
+
+    merged_lots = []
+    files_read = 0
+    writer = PdfWriter()
+
+    for lot_num, target_path in single_page:
         try:
-            reader = PdfReader(target_path)
-            page_count = len(reader.pages)
-            if page_count == 1:
+            # add_page() copies the page into the writer, so each source file is
+            # closed and its reader dropped right away instead of living until write()
+            with open(target_path, "rb") as fh:
+                reader = PdfReader(fh)
                 writer.add_page(reader.pages[0])
-                merged_lots.append(int(lot_num) if lot_num.isdigit() else lot_num)
-                print(f"  ✓ LOT {lot_num}: 1 page → included")
-            else:
-                skipped_lots.append((lot_num, page_count))
-                print(f"  ✗ LOT {lot_num}: {page_count} pages → skipped")
+            del reader
+            files_read += 1
+            if files_read % 50 == 0:
+                gc.collect()  # Readers hold reference cycles; reclaim them in batches
+            merged_lots.append(lot_num)
+            print(f"  ✓ LOT {lot_num}: 1 page → included")
         except Exception as e:
             skipped_lots.append((lot_num, f"error: {e}"))
             print(f"  ✗ LOT {lot_num}: could not read → skipped ({e})")
 
-    if len(merged_lots) < 2:
-        print(f"\n  Only {len(merged_lots)} single-page PDF(s) found, nothing to merge.")
-        return
-
-    # Build filename from LOT numbers
-    if all(isinstance(n, int) for n in merged_lots):
-        range_str = _format_lot_range(merged_lots)
-    else:
-        range_str = ",".join(str(n) for n in merged_lots)
-    merged_filename = f"Merged_{range_str}.pdf"
+    if len(merged_lots) < len(single_page):
+        # A page failed to copy — the output name must reflect what was actually merged
+        if len(merged_lots) < 2:
+            print(f"\n  Only {len(merged_lots)} single-page PDF(s) readable, nothing to merge.")
+            return
+        merged_filename = _merged_filename(merged_lots)
+        if merged_filename in on_disk:
+            print(f"\n  {merged_filename} already exists, skipping merge.")
+            return
     merged_path = os.path.join(download_dir, merged_filename)
 
-    if os.path.exists(merged_path):
-        print(f"\n  {merged_filename} already exists, skipping merge.")
-        return
-
     try:
-        writer.write(merged_path)
+        with open(merged_path, "wb") as out:
+            writer.write(out)
         print(f"\n  ✓ Merged PDF saved: {merged_filename}")
     except Exception as e:
         print(f"\n  ✗ Could not write merged PDF: {e}")
         return
+    finally:
+        writer.close()
 
     # Summary
     print(f"\n  {'─' * 50}")
     print(f"  MERGE SUMMARY")
     print(f"  {'─' * 50}")
-    if all(isinstance(n, int) for n in merged_lots):
-        print(f"  Merged LOTs : {_format_lot_range(merged_lots)}  ({len(merged_lots)} files)")
-    else:
-        print(f"  Merged LOTs : {', '.join(str(n) for n in merged_lots)}  ({len(merged_lots)} files)")
+    print(f"  Merged LOTs : {_format_lot_list(merged_lots, ', ')}  ({len(merged_lots)} files)")
     if skipped_lots:
         for lot_num, reason in skipped_lots:
             print(f"  Skipped LOT {lot_num}: {reason} page(s)")
@@ -1123,13 +1918,13 @@ def merge_single_page_pdfs(download_dir, lots):
 
 def process_lot(driver, wait, lot_data, is_first_lot):
     """
-    Process a single LOT. Updates lot_data dict in-place with status columns.
+    Process a single LOT. Updates lot_data (a Lot) in-place with status columns.
     Returns True on success, False on skip/failure.
     Raises SkipLotException if user skips via dashboard.
     """
-    lot = lot_data["LOT"]
-    rd_numbers = lot_data["RD Numbers"]
-    expected_count = lot_data["Count"]
+    lot = lot_data.LOT
+    rd_numbers = lot_data.RD_Numbers
+    expected_count = lot_data.Count
     remarks = []
 
     print(f"\n{'─' * 60}")
@@ -1140,154 +1935,126 @@ def process_lot(driver, wait, lot_data, is_first_lot):
     # ── Step 1: Ensure Cash mode ──
     checkpoint(dashboard_state, control_flags, "Step 1: Ensuring Cash mode")
     ensure_cash_mode(driver)
-    time.sleep(dashboard_state.delay_short)
 
     # ── Step 2: Clear textarea and enter account numbers ──
     checkpoint(dashboard_state, control_flags, "Step 2: Entering RD numbers")
     if is_first_lot:
         try:
-            textarea = driver.find_element(By.TAG_NAME, "textarea")
-            current_value = textarea.get_attribute("value") or ""
-            if current_value.strip():
-                clear_btn = driver.find_element(By.XPATH,
-                    "//input[@value='Clear Account' or contains(@value,'Clear')]")
-                clear_btn.click()
-                time.sleep(dashboard_state.delay_medium)
-                ensure_cash_mode(driver)
-                time.sleep(dashboard_state.delay_short)
-        except (NoSuchElementException, Exception):
-            pass
+            textarea = first_present(driver, ACCOUNT_TEXTAREA)
+            if textarea and (textarea.get_attribute("value") or "").strip():
+                clear_btn = first_present(driver, CLEAR_ACCOUNT_BTN)
+                if clear_btn:
+                    # Clear Account reloads the page — wait for the fresh textarea
+                    clear_btn.click()
+                    wait_ready(wait, EC.staleness_of(textarea))
+                    wait_ready(wait, ACCOUNT_TEXTAREA_SHOWN, dashboard_state.delay_medium)
+                    ensure_cash_mode(driver)
+        except Exception:
+            pass  # Stale element or click intercepted — the textarea is overwritten anyway
 
     if not clear_textarea_and_enter(driver, rd_numbers):
-        lot_data["Fetch_Status"] = "FAIL"
-        lot_data["Remarks"] = "Could not enter account IDs"
+        lot_data.Fetch_Status = "FAIL"
+        lot_data.Remarks = "Could not enter account IDs"
         return False
-    time.sleep(dashboard_state.delay_short)
 
     # ── Step 3: Click Fetch ──
     checkpoint(dashboard_state, control_flags, "Step 3: Clicking Fetch")
     if not click_fetch(driver, wait):
-        lot_data["Fetch_Status"] = "FAIL"
-        lot_data["Remarks"] = "Fetch button not found"
+        lot_data.Fetch_Status = "FAIL"
+        lot_data.Remarks = "Fetch button not found"
         return False
 
-    lot_data["Fetch_Status"] = "OK"
-    time.sleep(dashboard_state.delay_short)
+    lot_data.Fetch_Status = "OK"
 
     # ── Step 4: Verify count ──
     checkpoint(dashboard_state, control_flags, "Step 4: Verifying count")
     display_text = get_display_text(driver)
     parsed = parse_display_count(display_text)
+    total_pages = None  # Unknown — walk_pages reads it off the page
 
     if parsed:
         start, end, total = parsed
+        total_pages = -(-total // PAGE_SIZE)
         print(f"  Site: '{display_text}'")
         print(f"  Fetched total: {total}  |  Expected: {expected_count}")
 
         if total == expected_count:
-            lot_data["Count_Match"] = f"OK ({total}/{expected_count})"
+            lot_data.Count_Match = f"OK ({total}/{expected_count})"
             print(f"  ✓ Count MATCHES!")
         else:
-            lot_data["Count_Match"] = f"MISMATCH ({total}/{expected_count})"
+            lot_data.Count_Match = f"MISMATCH ({total}/{expected_count})"
             print(f"  ⚠ Count MISMATCH! Auto-pausing for review...")
             remarks.append(f"Count mismatch: site={total} csv={expected_count}")
-            # Auto-pause so user can decide via dashboard
-            control_flags.pause_event.clear()
-            with dashboard_state.lock:
-                dashboard_state.is_paused = True
-                dashboard_state.current_step = "PAUSED: Count mismatch - Resume to continue, Skip to skip LOT"
-            control_flags.pause_event.wait()  # Blocks until user resumes or skips
-            if control_flags.skip_lot.is_set():
-                control_flags.skip_lot.clear()
-                raise SkipLotException()
+            # Auto-pause so user can decide via dashboard (blocks until resume or skip)
+            pause_for_review(dashboard_state, control_flags,
+                             "PAUSED: Count mismatch - Resume to continue, Skip to skip LOT")
     else:
-        lot_data["Count_Match"] = "UNREADABLE"
+        lot_data.Count_Match = "UNREADABLE"
         print(f"  ⚠ Could not read display count, auto-pausing...")
-        control_flags.pause_event.clear()
-        with dashboard_state.lock:
-            dashboard_state.is_paused = True
-            dashboard_state.current_step = "PAUSED: Unreadable count - verify manually, then Resume"
-        control_flags.pause_event.wait()
-        if control_flags.skip_lot.is_set():
-            control_flags.skip_lot.clear()
-            raise SkipLotException()
-
-    time.sleep(dashboard_state.delay_short)
+        pause_for_review(dashboard_state, control_flags,
+                         "PAUSED: Unreadable count - verify manually, then Resume")
 
-    # ── Step 5: Validate due dates ──
-    checkpoint(dashboard_state, control_flags, "Step 5: Validating due dates")
-    print(f"  Checking due dates (expecting: {CURRENT_MONTH_ABBR})...")
-    bad_rows = validate_due_dates_all_pages(driver, expected_count)
+    # ── Steps 5-6: Validate due dates, then select checkboxes only if all are good ──
+    checkpoint(dashboard_state, control_flags, "Steps 5-6: Validating due dates & selecting")
+    print(f"  Checking due dates (expecting: {CURRENT_MONTH_ABBR}) and selecting checkboxes...")
+    bad_rows, total_selected = validate_and_select_all_pages(driver, expected_count,
+                                                             total_pages=total_pages)
 
     if bad_rows:
-        lot_data["Due_Date_Check"] = f"FAIL ({len(bad_rows)} bad)"
+        lot_data.Due_Date_Check = f"FAIL ({len(bad_rows)} bad)"
         print(f"\n  ✗ Due date mismatch in LOT {lot}!")
         for acct, due in bad_rows:
             print(f"    {acct}  →  {due}")
         remarks.append(f"Due date mismatch: {', '.join(a for a,d in bad_rows)}")
-        lot_data["Remarks"] = "; ".join(remarks)
+        lot_data.Remarks = "; ".join(remarks)
         print(f"  ⚠ Skipping LOT {lot}")
         return False
     else:
-        lot_data["Due_Date_Check"] = "OK"
+        lot_data.Due_Date_Check = "OK"
         print(f"  ✓ All due dates in {CURRENT_MONTH_ABBR}")
 
-    time.sleep(dashboard_state.delay_short)
-
-    # ── Step 6: Select all checkboxes ──
-    checkpoint(dashboard_state, control_flags, "Step 6: Selecting checkboxes")
-    print(f"  Selecting all checkboxes...")
-    total_selected = select_all_checkboxes_all_pages(driver, expected_count)
-    lot_data["Selected"] = str(total_selected)
+    lot_data.Selected = str(total_selected)
     print(f"  Total selected: {total_selected}")
 
-    time.sleep(dashboard_state.delay_short)
-
     # ── Step 7: Verify selection count ──
     checkpoint(dashboard_state, control_flags, "Step 7: Verifying selection")
-    display_text_after = get_display_text(driver)
-    parsed_after = parse_display_count(display_text_after)
+    # Selecting boxes leaves the results line alone; only a walk over several pages
+    # (which ends with a jump back to page 1) re-renders it, so only then re-read it
+    paginated = total_pages > 1 if total_pages is not None else expected_count > PAGE_SIZE
+    display_text_after = get_display_text(driver) if paginated else display_text
+    parsed_after = parse_display_count(display_text_after) if paginated else parsed
 
     if parsed_after:
         s2, e2, t2 = parsed_after
         print(f"  After selection: '{display_text_after}'")
         if total_selected == t2:
-            lot_data["Selection_Verified"] = f"OK ({total_selected}/{t2})"
+            lot_data.Selection_Verified = f"OK ({total_selected}/{t2})"
             print(f"  ✓ Selection verified: {total_selected} of {t2}")
         else:
-            lot_data["Selection_Verified"] = f"MISMATCH ({total_selected}/{t2})"
+            lot_data.Selection_Verified = f"MISMATCH ({total_selected}/{t2})"
             print(f"  ⚠ Selection mismatch: selected={total_selected}, total={t2}")
             remarks.append(f"Selection mismatch: {total_selected}/{t2}")
             # Auto-pause for review
-            control_flags.pause_event.clear()
-            with dashboard_state.lock:
-                dashboard_state.is_paused = True
-                dashboard_state.current_step = "PAUSED: Selection mismatch - Resume to save, Skip to skip LOT"
-            control_flags.pause_event.wait()
-            if control_flags.skip_lot.is_set():
-                control_flags.skip_lot.clear()
-                raise SkipLotException()
+            pause_for_review(dashboard_state, control_flags,
+                             "PAUSED: Selection mismatch - Resume to save, Skip to skip LOT")
     else:
         if total_selected == expected_count:
-            lot_data["Selection_Verified"] = f"OK ({total_selected}/{expected_count})"
+            lot_data.Selection_Verified = f"OK ({total_selected}/{expected_count})"
             print(f"  ✓ Selected {total_selected} = expected {expected_count}")
         else:
-            lot_data["Selection_Verified"] = f"CHECK ({total_selected}/{expected_count})"
+            lot_data.Selection_Verified = f"CHECK ({total_selected}/{expected_count})"
             print(f"  ⚠ Selected {total_selected}, expected {expected_count}")
             remarks.append(f"Selection check: {total_selected}/{expected_count}")
 
-    time.sleep(dashboard_state.delay_short)
-
     # ── Step 8: Click Save ──
     checkpoint(dashboard_state, control_flags, "Step 8: Saving")
     if not click_save(driver, wait):
-        lot_data["Save_Status"] = "FAIL"
+        lot_data.Save_Status = "FAIL"
         remarks.append("Save button not found")
-        lot_data["Remarks"] = "; ".join(remarks)
+        lot_data.Remarks = "; ".join(remarks)
         return False
 
-    lot_data["Save_Status"] = "OK"
-    time.sleep(dashboard_state.delay_short)
+    lot_data.Save_Status = "OK"
 
     # ── Step 9: Pay All Saved Installments ──
     checkpoint(dashboard_state, control_flags, "Step 9: Paying installments")
@@ -1295,23 +2062,46 @@ def process_lot(driver, wait, lot_data, is_first_lot):
     pay_ok, ref_id = click_pay_and_get_reference(driver, wait)
 
     if not pay_ok:
-        lot_data["Pay_Status"] = "FAIL"
+        lot_data.Pay_Status = "FAIL"
         remarks.append("Pay All Saved Installments failed")
-        lot_data["Remarks"] = "; ".join(remarks)
+        lot_data.Remarks = "; ".join(remarks)
         return False
 
-    lot_data["Pay_Status"] = "OK"
-    lot_data["Reference_ID"] = ref_id
-    lot_data["Remarks"] = "; ".join(remarks) if remarks else "Success"
+    lot_data.Pay_Status = "OK"
+    lot_data.Reference_ID = ref_id
+    lot_data.Remarks = "; ".join(remarks) if remarks else "Success"
 
     print(f"  ✓ LOT {lot} fully completed! Ref: {ref_id}")
 
-    # After Pay, we're back on the Deposit Accounts page automatically
-    time.sleep(dashboard_state.delay_short)
+    # After Pay, the portal redirects back to the Deposit Accounts page — wait for it
+    wait_ready(wait, DEPOSIT_PAGE_SHOWN, dashboard_state.delay_short)
 
     return True
 
 
+# ── Pacing between LOTs ──
+# The pause after a LOT scales with how long recent LOTs took (an EMA of their
+# wall time): a quick server gets a short pause, a slow one up to the dashboard's
+# delay_long. A failed LOT always gets the full delay_long.
+
+LOT_PAUSE_FRACTION = 0.1  # Pause = this fraction of the average LOT duration
+
+_lot_seconds_ema = None
+
+
+def pause_between_lots(lot_seconds, lot_ok):
+    """Sleep between LOTs, adapting to the average LOT duration so far."""
+    global _lot_seconds_ema
+    if not lot_ok:
+        time.sleep(dashboard_state.delay_long)
+        return
+    if _lot_seconds_ema is None:
+        _lot_seconds_ema = lot_seconds
+    else:
+        _lot_seconds_ema = 0.7 * _lot_seconds_ema + 0.3 * lot_seconds
+    time.sleep(min(dashboard_state.delay_long, LOT_PAUSE_FRACTION * _lot_seconds_ema))
+
+
 # ── Entry point ──
 
 def main():
@@ -1340,23 +2130,27 @@ def main():
 
     print(f"\n  File: {XLSX_FILE}")
 
-    # Read Excel
+    # Read Excel (plus any progress journaled by an interrupted run)
     lots = read_xlsx(XLSX_FILE)
+    replayed = replay_journal(XLSX_FILE, lots)
+    if replayed:
+        print(f"\n  Recovered {replayed} LOT update(s) from the progress journal")
+        flush_progress(XLSX_FILE, lots)
     start_global_timeout(lots)
     print(f"\nLoaded {len(lots)} LOTs from Excel")
     print(f"Current month for validation: {CURRENT_MONTH_ABBR}")
     print()
     for lot in lots:
-        pay = lot.get("Pay_Status", "")
-        save = lot.get("Save_Status", "")
-        ref = lot.get("Reference_ID", "")
+        pay = lot.Pay_Status
+        save = lot.Save_Status
+        ref = lot.Reference_ID
         if pay == "OK":
             marker = f" (done - Ref: {ref})" if ref else " (done)"
         elif save == "OK":
             marker = " (saved, NOT yet paid)"
         else:
             marker = ""
-        print(f"  LOT {lot['LOT']}: {lot['Count']} accounts{marker}")
+        print(f"  LOT {lot.LOT}: {lot.Count} accounts{marker}")
 
     # Ask which LOTs to process (terminal input, before automation starts)
     print(f"\nProcess all LOTs (1-{len(lots)})? Or specify range.")
@@ -1389,24 +2183,41 @@ def main():
         print("  Invalid input, processing all LOTs.")
         lots_to_process = list(range(len(lots)))
 
-    # Initialize dashboard state
-    dashboard_state.start_time = time.time()
-    dashboard_state.lots_total = len(lots_to_process)
-    dashboard_state.current_phase = "Phase 1"
+    # Paid LOTs need no Phase 1 work; drop them before the browser is even opened.
+    # A LOT listed twice (e.g. '1,3,1') is only processed once.
+    selected = list(dict.fromkeys(lots_to_process))
+    lots_to_process = [i for i in selected if lots[i].Pay_Status != "OK"]
+    already_done = len(selected) - len(lots_to_process)
+    if already_done:
+        print(f"\n  {already_done} selected LOT(s) already done, skipping them.")
+
+    # Nothing left for Phase 1 and every PDF on disk → no need to open Chrome at all
+    on_disk = list_downloaded_pdfs(DOWNLOAD_DIR)
+    pdfs_missing = any(l.Reference_ID and lot_pdf_name(l) not in on_disk for l in lots)
+    if not lots_to_process and not pdfs_missing:
+        print("\n  0 LOTs to process and all PDFs already downloaded — nothing to do.")
+        merge_single_page_pdfs(DOWNLOAD_DIR, lots)
+        stop_global_timeout()
+        return
+
+    # Initialize dashboard state (writes go through the lock, which publishes them)
     dashboard_state.delay_short = DELAY_SHORT
     dashboard_state.delay_medium = DELAY_MEDIUM
     dashboard_state.delay_long = DELAY_LONG
-    dashboard_state.delay_checkbox = DELAY_CHECKBOX
-    dashboard_state.lot_statuses = [
-        {
-            "lot": lots[i]["LOT"],
-            "count": lots[i]["Count"],
-            "status": "done" if lots[i].get("Pay_Status") == "OK" else "pending",
-            "ref_id": lots[i].get("Reference_ID", ""),
-            "step": ""
-        }
-        for i in range(len(lots))
-    ]
+    with dashboard_state.lock:
+        dashboard_state.start_time = time.monotonic()
+        dashboard_state.lots_total = len(lots_to_process)
+        dashboard_state.current_phase = "Phase 1"
+        dashboard_state.lot_statuses = [
+            {
+                "lot": lots[i].LOT,
+                "count": lots[i].Count,
+                "status": "done" if lots[i].Pay_Status == "OK" else "pending",
+                "ref_id": lots[i].Reference_ID,
+                "step": ""
+            }
+            for i in range(len(lots))
+        ]
 
     # Start web dashboard
     start_dashboard(dashboard_state, control_flags)
@@ -1415,7 +2226,9 @@ def main():
     # Setup browser (with download dir set for Phase 2)
     os.makedirs(DOWNLOAD_DIR, exist_ok=True)
     driver = setup_driver(download_dir=DOWNLOAD_DIR)
-    wait = WebDriverWait(driver, WAIT_TIMEOUT)
+    # One shared wait for every helper, polling faster than Selenium's 0.5 s default
+    wait = session_wait(driver)
+    start_memory_pressure_watch()
 
     # Wait for manual login
     with dashboard_state.lock:
@@ -1432,88 +2245,81 @@ def main():
     for idx in lots_to_process:
         lot_data = lots[idx]
 
-        # Skip if already fully done
-        if lot_data.get("Pay_Status") == "OK":
-            ref = lot_data.get("Reference_ID", "")
-            print(f"\n  LOT {lot_data['LOT']} already done (Ref: {ref}), skipping.")
-            continue
-
         # Check if user marked this LOT to skip via dashboard
-        with control_flags.lock:
-            if lot_data["LOT"] in control_flags.skip_lots_set:
-                print(f"\n  LOT {lot_data['LOT']} skipped by user (dashboard).")
-                with dashboard_state.lock:
-                    dashboard_state.lot_statuses[idx]["status"] = "skipped"
-                    dashboard_state.lots_skipped += 1
-                skip_count += 1
-                continue
+        if lot_data.LOT in control_flags.skip_lots:
+            print(f"\n  LOT {lot_data.LOT} skipped by user (dashboard).")
+            with dashboard_state.lock:
+                dashboard_state.update_lot(idx, status="skipped")
+                dashboard_state.lots_skipped += 1
+            skip_count += 1
+            continue
 
         # Update dashboard state
         with dashboard_state.lock:
-            dashboard_state.current_lot = lot_data["LOT"]
-            dashboard_state.lot_statuses[idx]["status"] = "running"
+            dashboard_state.current_lot = lot_data.LOT
+            dashboard_state.update_lot(idx, status="running")
             dashboard_state.current_step = "Starting LOT"
 
         # Memory watchdog
         mem_ok = check_memory_usage(driver)
-        with dashboard_state.lock:
-            dashboard_state.memory_mb = _get_memory_mb()
         if not mem_ok:
-            write_xlsx(XLSX_FILE, lots)
+            flush_progress(XLSX_FILE, lots)
             print("  Progress saved. Restart the script to continue (it will resume).")
             sys.exit(1)
 
+        lot_started = time.monotonic()
+        result = False
         try:
+            begin_lot_progress(lot_data)
             result = process_lot(driver, wait, lot_data, is_first_lot)
             is_first_lot = False
             if result:
                 success_count += 1
                 with dashboard_state.lock:
-                    dashboard_state.lot_statuses[idx]["status"] = "done"
-                    dashboard_state.lot_statuses[idx]["ref_id"] = lot_data.get("Reference_ID", "")
+                    dashboard_state.update_lot(idx, status="done", ref_id=lot_data.Reference_ID)
                     dashboard_state.lots_done += 1
             else:
                 fail_count += 1
                 with dashboard_state.lock:
-                    dashboard_state.lot_statuses[idx]["status"] = "failed"
+                    dashboard_state.update_lot(idx, status="failed")
                     dashboard_state.lots_failed += 1
 
         except SkipLotException:
-            print(f"\n  LOT {lot_data['LOT']} skipped by user.")
-            lot_data["Remarks"] = "Skipped by user"
-            lot_data["Pay_Status"] = "SKIP"
+            print(f"\n  LOT {lot_data.LOT} skipped by user.")
+            lot_data.Remarks = "Skipped by user"
+            lot_data.Pay_Status = "SKIP"
             skip_count += 1
             is_first_lot = False
             with dashboard_state.lock:
-                dashboard_state.lot_statuses[idx]["status"] = "skipped"
+                dashboard_state.update_lot(idx, status="skipped")
                 dashboard_state.lots_skipped += 1
 
         except StopAfterCurrentException:
             print(f"\n  Stop requested by user. Saving and exiting.")
-            write_xlsx(XLSX_FILE, lots)
+            flush_progress(XLSX_FILE, lots)
             print(f"  Progress saved.")
             break
 
         except Exception as e:
-            print(f"\n✗ Error processing LOT {lot_data['LOT']}: {e}")
-            lot_data["Remarks"] = f"Error: {e}"
+            print(f"\n✗ Error processing LOT {lot_data.LOT}: {e}")
+            lot_data.Remarks = f"Error: {e}"
             fail_count += 1
             is_first_lot = False
             with dashboard_state.lock:
-                dashboard_state.lot_statuses[idx]["status"] = "failed"
+                dashboard_state.update_lot(idx, status="failed")
                 dashboard_state.lots_failed += 1
             # Auto-continue instead of blocking on input()
             print("  Continuing to next LOT automatically...")
 
-        # Save progress after every LOT
-        write_xlsx(XLSX_FILE, lots)
-        print(f"  Progress saved to XLSX")
+        # Save progress after every LOT (journal now, full XLSX every few LOTs)
+        save_progress(XLSX_FILE, lots, lot_data)
+        print(f"  Progress saved")
 
-        # Breathing room between LOTs
-        time.sleep(dashboard_state.delay_long)
+        # Breathing room between LOTs, shorter while the server is responding quickly
+        pause_between_lots(time.monotonic() - lot_started, result)
 
     # Final save
-    write_xlsx(XLSX_FILE, lots)
+    flush_progress(XLSX_FILE, lots)
 
     # Phase 1 Summary
     with dashboard_state.lock:
@@ -1530,7 +2336,7 @@ def main():
     print(f"  XLSX : {XLSX_FILE} (Reference_ID column in GREEN)")
 
     # Check if any LOTs have reference IDs for Phase 2
-    lots_with_refs = [l for l in lots if l.get("Reference_ID", "")]
+    lots_with_refs = [l for l in lots if l.Reference_ID]
     if lots_with_refs:
         print(f"\n  {len(lots_with_refs)} LOTs have Reference IDs ready for PDF download.")
         phase2_input = input("\n  Start Phase 2 (PDF Downloads)? (y/n): ").strip().lower()
@@ -1552,6 +2358,7 @@ def main():
         dashboard_state.current_phase = "Complete"
         dashboard_state.current_step = "All done"
 
+    stop_global_timeout()
     print(f"\n  Browser will remain open. Close it manually when done.")
 
 
@@ -10,17 +10,45 @@ Usage (standalone test):
 Usage (from dop_automate.py):
     from dop_dashboard import (
         DashboardState, ControlFlags, SkipLotException,
-        StopAfterCurrentException, checkpoint, start_dashboard
+        StopAfterCurrentException, checkpoint, pause_for_review, start_dashboard
     )
 """
 
+import os
 import json
 import time
+import zlib
+import hashlib
+import socket
+import platform
+import logging
+import itertools
 import threading
 from dataclasses import dataclass, field
-from collections import deque
 from datetime import datetime
 
+# orjson (optional) serialises straight to bytes, several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_bytes(obj):
+    """obj as UTF-8 JSON bytes, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+LOG_LINES = 80  # Dashboard log keeps this many of the latest lines
+SSE_TICK_MIN = 0.2  # Seconds between state checks right after a change
+SSE_TICK_MAX = 2.0  # Longest gap between checks once the state has gone quiet
+SSE_KEEPALIVE = 15.0  # Seconds of silence before the stream sends a comment line
+
+# Log lines reach the dashboard through the "dop" logger's handler (dop_automate.py)
+log = logging.getLogger("dop")
+
 
 # ── Exceptions ──
 
@@ -36,9 +64,38 @@ class StopAfterCurrentException(Exception):
 
 # ── Shared State ──
 
+class _ChangeLock:
+    """
+    The dashboard state's lock, taken only by writers. Every `with state.lock:` block
+    is a write: leaving one runs on_release (the state republishes its snapshot) and
+    stamps a new version. Versions come from an itertools.count, so a lock-free
+    touch() racing a locked write still leaves a version no stream has seen.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ticks = itertools.count(1)
+        self.version = 0
+        self.on_release = None
+
+    def touch(self):
+        self.version = next(self._ticks)
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        if self.on_release:
+            self.on_release()
+        self.touch()
+        self._lock.release()
+
+
 @dataclass
 class DashboardState:
-    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Write the fields below (up to the log) only inside `with lock:` — leaving the
+    # block publishes them; readers see the published snapshot, not the live fields
+    lock: _ChangeLock = field(default_factory=_ChangeLock)
 
     # Progress
     current_phase: str = "Startup"
@@ -49,82 +106,242 @@ class DashboardState:
     lots_skipped: int = 0
     lots_failed: int = 0
 
-    # Per-LOT status list
+    # Per-LOT status list. Rows are replaced, never edited in place (see update_lot),
+    # so snapshots share unchanged rows instead of copying them
     lot_statuses: list = field(default_factory=list)
 
     # System
     memory_mb: float = 0.0
-    start_time: float = 0.0
+    start_time: float = 0.0  # time.monotonic() when the run started; 0 until then
     is_paused: bool = False
     is_finished: bool = False
-
-    # Log buffer (last 80 messages)
-    log_messages: deque = field(default_factory=lambda: deque(maxlen=80))
-
-    # Live-editable config
+    # LOTs marked to skip, mirrored from ControlFlags.skip_lots so every open page
+    # (and a reloaded one) shows the same Skip/Unskip buttons
+    skip_lots: tuple = ()
+
+    # Log ring buffer: line number seq lives in slot seq % LOG_LINES as (seq, message).
+    # log_seq is the newest line's number, so a stream can send just the lines newer
+    # than its last frame. Written by one thread at a time and read without a lock.
+    log_slots: list = field(default_factory=lambda: [None] * LOG_LINES)
+    log_seq: int = 0
+
+    # Live-editable config — guarded by config_lock, since only the dashboard writes it
+    # and the automation thread just reads single values
     delay_short: float = 1.5
     delay_medium: float = 3.0
     delay_long: float = 5.0
-    delay_checkbox: float = 0.4
+    config_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.lock.on_release = self._publish
+        self._publish()
+
+    def _publish(self):
+        """
+        Replace the published snapshot of the lock-guarded fields. Runs as each
+        `with state.lock:` block exits, so the writer builds it and readers just
+        take the reference — one attribute read, no lock. The snapshot is never
+        modified after this; LOT rows are immutable too, so the tuple shares them.
+        """
+        self._snapshot = {
+            "current_phase": self.current_phase,
+            "current_lot": self.current_lot,
+            "current_step": self.current_step,
+            "lots_done": self.lots_done,
+            "lots_total": self.lots_total,
+            "lots_skipped": self.lots_skipped,
+            "lots_failed": self.lots_failed,
+            "lot_statuses": tuple(self.lot_statuses),
+            "is_paused": self.is_paused,
+            "is_finished": self.is_finished,
+            "skip_lots": self.skip_lots,
+            "memory_mb": round(self.memory_mb, 1),
+            "start_time": self.start_time,
+        }
+
+    @property
+    def version(self):
+        """Changes whenever the state does (elapsed time aside, which the page counts itself)."""
+        return self.lock.version
+
+    def touch(self):
+        """Mark the state changed after a write made without the lock."""
+        self.lock.touch()
+
+    def update_lot(self, idx, **changes):
+        """Replace LOT row idx with a copy carrying changes. Call with the lock held."""
+        self.lot_statuses[idx] = {**self.lot_statuses[idx], **changes}
+
+    def log(self, message):
+        """
+        Append a line to the dashboard log. Callers must not overlap: the "dop"
+        logger's handler lock serialises them, so log through that logger.
+        """
+        seq = self.log_seq + 1
+        self.log_slots[seq % LOG_LINES] = (seq, message)
+        self.log_seq = seq  # Publish only once the slot holds the line
+        self.touch()
+
+    def log_tail(self):
+        """The buffered log lines, oldest first, and the newest one's seq."""
+        seq = self.log_seq
+        lines = []
+        for n in range(max(1, seq - LOG_LINES + 1), seq + 1):
+            entry = self.log_slots[n % LOG_LINES]
+            if entry[0] == n:  # Otherwise a newer line overwrote it while we read
+                lines.append(entry[1])
+        return lines, seq
 
     def to_dict(self):
-        with self.lock:
-            return {
-                "current_phase": self.current_phase,
-                "current_lot": self.current_lot,
-                "current_step": self.current_step,
-                "lots_done": self.lots_done,
-                "lots_total": self.lots_total,
-                "lots_skipped": self.lots_skipped,
-                "lots_failed": self.lots_failed,
-                "lot_statuses": [dict(s) for s in self.lot_statuses],
-                "memory_mb": round(self.memory_mb, 1),
-                "elapsed_seconds": int(time.time() - self.start_time) if self.start_time else 0,
-                "is_paused": self.is_paused,
-                "is_finished": self.is_finished,
-                "log_messages": list(self.log_messages),
-                "config": {
-                    "delay_short": self.delay_short,
-                    "delay_medium": self.delay_medium,
-                    "delay_long": self.delay_long,
-                    "delay_checkbox": self.delay_checkbox,
-                },
-            }
+        # The state lock is never taken here: the last published snapshot is read instead
+        fields = dict(self._snapshot)
+        logs, log_seq = self.log_tail()
+        with self.config_lock:
+            short, medium, long = self.delay_short, self.delay_medium, self.delay_long
+
+        start_time = fields.pop("start_time")
+        fields["elapsed_seconds"] = int(time.monotonic() - start_time) if start_time else 0
+        fields["timer_running"] = bool(start_time) and not fields["is_finished"]
+        fields["log_messages"] = logs
+        fields["log_seq"] = log_seq
+        fields["log_limit"] = LOG_LINES
+        fields["config"] = {"delay_short": short, "delay_medium": medium, "delay_long": long}
+        return fields
 
 
 @dataclass
 class ControlFlags:
-    pause_event: threading.Event = field(default_factory=threading.Event)
-    skip_lot: threading.Event = field(default_factory=threading.Event)
-    stop_after_current: threading.Event = field(default_factory=threading.Event)
-    skip_lots_set: set = field(default_factory=set)
+    """
+    Run/pause/skip/stop requests from the dashboard. Every change is made under
+    `changed` and wakes all waiters, so a skip ends a pause on its own and the
+    automation thread never sees a half-applied state.
+    """
+    changed: threading.Condition = field(default_factory=threading.Condition)
+    paused: bool = False
+    skip_requested: bool = False
+    stop_requested: bool = False
+    # LOTs marked to skip: replaced whole (copy-on-write) under lock by toggle_lot,
+    # so the automation thread checks membership without taking any lock
+    skip_lots: frozenset = frozenset()
     lock: threading.Lock = field(default_factory=threading.Lock)
 
-    def __post_init__(self):
-        self.pause_event.set()  # Start in running state
+    def _update(self, **flags):
+        with self.changed:
+            for name, value in flags.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+    def pause(self):
+        self._update(paused=True)
+
+    def resume(self):
+        self._update(paused=False)
+
+    def request_skip(self):
+        self._update(skip_requested=True, paused=False)
+
+    def request_stop(self):
+        self._update(stop_requested=True)
+
+    # Both checks below read the flag lock-free first: the common case (running, no
+    # skip) is decided by one attribute read, and only a set flag takes the lock
+
+    def toggle_lot(self, lot):
+        """Mark or unmark LOT lot to be skipped. Returns the new skip set."""
+        with self.lock:
+            self.skip_lots = self.skip_lots ^ {lot}
+            return self.skip_lots
+
+    def wait_until_running(self, timeout=None):
+        """Block while paused (a skip request also ends the wait). False on timeout."""
+        if not self.paused:
+            return True
+        with self.changed:
+            return self.changed.wait_for(lambda: not self.paused or self.skip_requested, timeout)
+
+    def take_skip(self):
+        """Whether a skip was requested; consumes the request."""
+        if not self.skip_requested:
+            return False
+        with self.changed:
+            requested, self.skip_requested = self.skip_requested, False
+            return requested
 
 
 # ── Checkpoint ──
 
 def checkpoint(state: DashboardState, control: ControlFlags, step_name: str = ""):
     """Called between automation steps. Blocks if paused, raises on skip/stop."""
-    if step_name:
+    # Lock-free compare first: an unchanged step skips the lock and its republish
+    if step_name and state.current_step != step_name:
         with state.lock:
             state.current_step = step_name
-    if not control.pause_event.wait(timeout=300):
+    if not control.wait_until_running(timeout=300):
         # Still paused after 5 minutes — log a warning but keep waiting
-        with state.lock:
-            state.log_messages.append(
-                f"{time.strftime('%H:%M:%S')}  WARNING: Paused for 5+ minutes at '{step_name}'"
-            )
-        control.pause_event.wait()
-    if control.skip_lot.is_set():
-        control.skip_lot.clear()
+        log.warning(f"WARNING: Paused for 5+ minutes at '{step_name}'")
+        control.wait_until_running()
+    if control.take_skip():
         raise SkipLotException()
-    if control.stop_after_current.is_set():
+    if control.stop_requested:
         raise StopAfterCurrentException()
 
 
+def pause_for_review(state: DashboardState, control: ControlFlags, message: str):
+    """
+    Auto-pause with message shown as the current step, until the user resumes
+    (returns) or skips (raises SkipLotException) from the dashboard.
+    """
+    control.pause()
+    with state.lock:
+        state.is_paused = True
+        state.current_step = message
+    control.wait_until_running()
+    if control.take_skip():
+        raise SkipLotException()
+
+
+# ── SSE payloads ──
+
+def _state_patch(prev, cur):
+    """
+    What changed between two to_dict() snapshots: changed top-level fields as they
+    are, changed LOT rows as lot_updates {index: row} (the whole list if its length
+    changed), and log lines newer than prev's as new_logs. elapsed_seconds is always
+    included so the page's timer stays anchored.
+    """
+    patch = {"elapsed_seconds": cur["elapsed_seconds"]}
+    for key, value in cur.items():
+        if key not in ("lot_statuses", "log_messages", "elapsed_seconds") and prev.get(key) != value:
+            patch[key] = value
+
+    prev_lots, lots = prev["lot_statuses"], cur["lot_statuses"]
+    if len(prev_lots) != len(lots):
+        patch["lot_statuses"] = lots
+    else:
+        # JSON object keys are strings (orjson refuses int keys outright)
+        # A row changed only if update_lot replaced it, so identity is the whole check
+        updates = {str(i): row for i, (old, row) in enumerate(zip(prev_lots, lots)) if old is not row}
+        if updates:
+            patch["lot_updates"] = updates
+
+    added = cur["log_seq"] - prev["log_seq"]
+    if added > 0:
+        patch["new_logs"] = cur["log_messages"][-added:]
+    return patch
+
+
+def _gzip_frames(frames):
+    """
+    Gzip a stream of SSE frames as one compressed stream. Each frame is sync-flushed,
+    so the browser can decode it as soon as it arrives, while field names repeated
+    across frames still compress against the earlier ones.
+    """
+    gz = zlib.compressobj(wbits=31)  # 31: gzip container
+    for frame in frames:
+        yield gz.compress(frame) + gz.flush(zlib.Z_SYNC_FLUSH)
+    yield gz.flush()
+
+
 # ── Flask App ──
 
 def _create_app(state: DashboardState, control: ControlFlags):
@@ -134,22 +351,54 @@ def _create_app(state: DashboardState, control: ControlFlags):
 
     @app.route("/")
     def index():
-        return DASHBOARD_HTML
+        # Pre-encoded page; a reload with a matching ETag gets a bodiless 304
+        resp = Response(DASHBOARD_HTML_BYTES, mimetype="text/html",
+                        headers={"Cache-Control": "no-cache"})
+        resp.set_etag(DASHBOARD_ETAG)
+        return resp.make_conditional(request)
 
     @app.route("/api/state")
     def sse_stream():
         def generate():
+            # The first frame is a full snapshot; after that, only what changed is sent
+            # as a patch, and only when the state has changed since the last frame.
+            # A reconnecting browser opens a new stream, so it starts from a snapshot.
+            # Checks back off while nothing changes and snap back after a change; a
+            # stream that has been quiet for SSE_KEEPALIVE sends a comment line so
+            # proxies do not drop it (and a closed tab is noticed).
+            last_version, sent = None, None
+            tick = SSE_TICK_MIN
+            last_write = time.monotonic()
             try:
                 while True:
-                    data = json.dumps(state.to_dict())
-                    yield f"data: {data}\n\n"
-                    if state.is_finished:
-                        break
-                    time.sleep(0.5)
+                    version = state.version
+                    if version != last_version:
+                        last_version = version
+                        snap = state.to_dict()
+                        if sent is None:
+                            event, payload = b"snapshot", snap
+                        else:
+                            event, payload = b"patch", _state_patch(sent, snap)
+                        sent = snap
+                        yield b"event: %s\nid: %d\ndata: %s\n\n" % (event, version, _json_bytes(payload))
+                        last_write = time.monotonic()
+                        if snap["is_finished"]:
+                            break
+                        tick = SSE_TICK_MIN
+                    else:
+                        if time.monotonic() - last_write >= SSE_KEEPALIVE:
+                            yield b": keepalive\n\n"
+                            last_write = time.monotonic()
+                        tick = min(tick * 2, SSE_TICK_MAX)
+                    time.sleep(tick)
             except GeneratorExit:
                 return
-        return Response(generate(), mimetype="text/event-stream",
-                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Vary": "Accept-Encoding"}
+        frames = generate()
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            frames = _gzip_frames(frames)
+            headers["Content-Encoding"] = "gzip"
+        return Response(frames, mimetype="text/event-stream", headers=headers)
 
     @app.route("/api/control", methods=["POST"])
     def handle_control():
@@ -157,52 +406,49 @@ def _create_app(state: DashboardState, control: ControlFlags):
         action = body.get("action")
 
         if action == "pause":
-            control.pause_event.clear()
+            control.pause()
             with state.lock:
                 state.is_paused = True
             return jsonify({"ok": True, "status": "paused"})
 
         elif action == "resume":
-            control.pause_event.set()
+            control.resume()
             with state.lock:
                 state.is_paused = False
             return jsonify({"ok": True, "status": "resumed"})
 
         elif action == "skip":
-            control.skip_lot.set()
-            control.pause_event.set()
+            control.request_skip()
             with state.lock:
                 state.is_paused = False
             return jsonify({"ok": True, "status": "skipping"})
 
         elif action == "stop_after_current":
-            control.stop_after_current.set()
+            control.request_stop()
             return jsonify({"ok": True, "status": "stopping"})
 
         elif action == "update_config":
             config = body.get("config", {})
             try:
-                with state.lock:
+                with state.config_lock:
                     if "delay_short" in config:
                         state.delay_short = max(0.1, float(config["delay_short"]))
                     if "delay_medium" in config:
                         state.delay_medium = max(0.1, float(config["delay_medium"]))
                     if "delay_long" in config:
                         state.delay_long = max(0.1, float(config["delay_long"]))
-                    if "delay_checkbox" in config:
-                        state.delay_checkbox = max(0.05, float(config["delay_checkbox"]))
             except (ValueError, TypeError) as e:
                 return jsonify({"ok": False, "error": f"Invalid config value: {e}"}), 400
+            finally:
+                state.touch()
             return jsonify({"ok": True})
 
         elif action == "toggle_lot":
-            lot_num = str(body.get("lot", ""))
-            with control.lock:
-                if lot_num in control.skip_lots_set:
-                    control.skip_lots_set.discard(lot_num)
-                else:
-                    control.skip_lots_set.add(lot_num)
-            return jsonify({"ok": True, "skip_lots": list(control.skip_lots_set)})
+            # Toggled under the state lock so concurrent clicks mirror in the order applied
+            with state.lock:
+                state.skip_lots = tuple(sorted(control.toggle_lot(str(body.get("lot", "")))))
+                skip_lots = state.skip_lots
+            return jsonify({"ok": True, "skip_lots": list(skip_lots)})
 
         return jsonify({"ok": False, "error": "unknown action"}), 400
 
@@ -213,43 +459,36 @@ def start_dashboard(state: DashboardState, control: ControlFlags, port=5555):
     """Start Flask dashboard on a daemon thread. Tries ports 5555-5560."""
     app = _create_app(state, control)
 
-    import logging
-    log = logging.getLogger("werkzeug")
-    log.setLevel(logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
-    import socket
+    from werkzeug.serving import make_server
 
     for p in range(port, port + 6):
-        # Pre-check if port is available
+        # Bind and listen here, then hand the socket to the server: no window for another
+        # program to take the port, and it accepts connections as soon as listen() returns.
+        # On Linux, SO_REUSEADDR only lets a restart reuse a port still in TIME_WAIT.
+        # Elsewhere it would let the bind succeed next to a live server (on macOS, one
+        # listening on *:p; on Windows, any), so there a taken port fails over to the
+        # next — Windows claims it exclusively, macOS binds plainly.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(("127.0.0.1", p))
+            if os.name == "nt":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            elif platform.system() == "Linux":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("127.0.0.1", p))
+            sock.listen(socket.SOMAXCONN)
+            # One thread per request: an open SSE stream must not hold up control POSTs
+            server = make_server("127.0.0.1", p, app, threaded=True, fd=sock.fileno())
         except OSError:
             continue
+        finally:
+            sock.close()  # The server works on its own duplicate of the socket
 
-        def _run(port_num):
-            try:
-                app.run(host="127.0.0.1", port=port_num, debug=False, use_reloader=False)
-            except OSError:
-                pass
-
-        thread = threading.Thread(target=_run, args=(p,), daemon=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
         thread.start()
-
-        # Poll until Flask is actually accepting TCP connections (up to 3 s).
-        # This replaces the old before_request approach which required a browser
-        # to connect within 3 s — that never happened, so all 6 ports got threads
-        # and "Could not start dashboard" was always printed.
-        deadline = time.time() + 3.0
-        while time.time() < deadline:
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(0.1)
-                    s.connect(("127.0.0.1", p))
-                print(f"  Dashboard running at http://127.0.0.1:{p}")
-                return thread
-            except OSError:
-                time.sleep(0.05)
+        print(f"  Dashboard running at http://127.0.0.1:{p}")
+        return thread
 
     print("  Could not start dashboard (ports 5555-5560 in use)")
     return None
@@ -739,7 +978,7 @@ tr.running { background: rgba(79,70,229,0.05); }
                 <button class="btn btn-stop" onclick="sendControl('stop_after_current')">Stop After Current</button>
             </div>
         </div>
-        <div class="card">
+        <div class="card" id="delaySliders">
             <div class="card-title">Delays (Live)</div>
             <div class="delay-group">
                 <div class="delay-header">
@@ -747,7 +986,7 @@ tr.running { background: rgba(79,70,229,0.05); }
                     <span class="delay-value" id="valShort">1.5s</span>
                 </div>
                 <input type="range" min="0.1" max="5" step="0.1" value="1.5"
-                       id="sliderShort" oninput="updateDelay('delay_short', this.value, 'valShort')">
+                       id="sliderShort" data-key="delay_short" data-val="valShort">
             </div>
             <div class="delay-group">
                 <div class="delay-header">
@@ -755,7 +994,7 @@ tr.running { background: rgba(79,70,229,0.05); }
                     <span class="delay-value" id="valMedium">3.0s</span>
                 </div>
                 <input type="range" min="0.5" max="10" step="0.1" value="3.0"
-                       id="sliderMedium" oninput="updateDelay('delay_medium', this.value, 'valMedium')">
+                       id="sliderMedium" data-key="delay_medium" data-val="valMedium">
             </div>
             <div class="delay-group">
                 <div class="delay-header">
@@ -763,15 +1002,7 @@ tr.running { background: rgba(79,70,229,0.05); }
                     <span class="delay-value" id="valLong">5.0s</span>
                 </div>
                 <input type="range" min="1" max="15" step="0.1" value="5.0"
-                       id="sliderLong" oninput="updateDelay('delay_long', this.value, 'valLong')">
-            </div>
-            <div class="delay-group">
-                <div class="delay-header">
-                    <span class="delay-label">Checkbox</span>
-                    <span class="delay-value" id="valCheckbox">0.4s</span>
-                </div>
-                <input type="range" min="0.05" max="2" step="0.05" value="0.4"
-                       id="sliderCheckbox" oninput="updateDelay('delay_checkbox', this.value, 'valCheckbox')">
+                       id="sliderLong" data-key="delay_long" data-val="valLong">
             </div>
         </div>
     </div>
@@ -795,6 +1026,8 @@ tr.running { background: rgba(79,70,229,0.05); }
                 </thead>
                 <tbody id="lotTableBody"></tbody>
             </table>
+            <!-- One LOT row, cloned per LOT by lotRow() -->
+            <template id="lotRowTemplate"><tr><td></td><td></td><td><span class="pill"></span></td><td style="font-family:monospace;font-size:12px"></td><td style="color:var(--text-secondary);font-size:12px"></td><td><button class="skip-btn"></button></td></tr></template>
         </div>
     </div>
 
@@ -806,28 +1039,72 @@ tr.running { background: rgba(79,70,229,0.05); }
         </div>
         <div class="log-scroll" id="logScroll">
             <div id="logBody"></div>
+            <template id="logLineTemplate"><div class="log-line"></div></template>
         </div>
     </div>
 
 </div>
 
 <script>
+// Every element the updates write to, looked up once: the script runs after the markup
+const els = {};
+[
+    'timer', 'connectionDot', 'finishedBanner', 'statPhase', 'statLot', 'statDone',
+    'statFailed', 'statSkipped', 'statMemory', 'pausedBadge', 'btnPause',
+    'progressPhase', 'progressStep', 'progressBar', 'progressText', 'logBody',
+    'logScroll', 'logCount', 'lotTableBody', 'delaySliders', 'sliderShort', 'valShort',
+    'sliderMedium', 'valMedium', 'sliderLong', 'valLong'
+].forEach(function(id) { els[id] = document.getElementById(id); });
+
+// Most frames repeat most of the page's text, and assigning textContent replaces the
+// text node even when the string is the same, so only write text that differs
+function setText(el, text) {
+    text = String(text);
+    if (el.textContent !== text) el.textContent = text;
+}
+
 let isPaused = false;
 let skipLots = new Set();
-let debounceTimers = {};
+// Slider changes wait here until no slider has moved for 200 ms, then go in one POST
+let pendingConfig = {};
+let configTimer = 0;
+
+// The server only sends a frame when something changed, so the timer runs
+// locally from the last elapsed_seconds it reported
+let elapsedBase = 0, elapsedAt = 0, timerRunning = false;
+function renderTimer() {
+    let secs = elapsedBase;
+    if (timerRunning) secs += Math.floor((Date.now() - elapsedAt) / 1000);
+    const mins = Math.floor(secs / 60);
+    setText(els.timer, String(mins).padStart(2, '0') + ':' + String(secs % 60).padStart(2, '0'));
+}
+setInterval(renderTimer, 1000);
 
-// SSE connection with exponential backoff
+// SSE connection with exponential backoff; model is the state as last received
 let sseBackoff = 2000;
+let model = null;
 function connectSSE() {
-    const dot = document.getElementById('connectionDot');
+    const dot = els.connectionDot;
     const evtSource = new EventSource('/api/state');
 
-    evtSource.onmessage = function(e) {
+    function received() {
         dot.classList.remove('disconnected');
         sseBackoff = 2000;  // Reset on successful message
-        const data = JSON.parse(e.data);
-        updateDashboard(data);
-    };
+    }
+
+    // A stream opens with the full state, then sends only what changed
+    evtSource.addEventListener('snapshot', function(e) {
+        model = JSON.parse(e.data);
+        received();
+        scheduleRender(['all']);
+    });
+    evtSource.addEventListener('patch', function(e) {
+        if (!model) return;
+        const p = JSON.parse(e.data);
+        applyPatch(p);
+        received();
+        scheduleRender(patchParts(p));
+    });
 
     evtSource.onerror = function() {
         dot.classList.add('disconnected');
@@ -837,141 +1114,304 @@ function connectSSE() {
     };
 }
 
+function applyPatch(p) {
+    Object.keys(p).forEach(function(key) {
+        if (key === 'lot_updates') {
+            Object.keys(p.lot_updates).forEach(function(i) {
+                model.lot_statuses[i] = p.lot_updates[i];
+            });
+        } else if (key === 'new_logs') {
+            const logs = model.log_messages;
+            logs.push.apply(logs, p.new_logs);
+            if (logs.length > model.log_limit) logs.splice(0, logs.length - model.log_limit);
+        } else {
+            model[key] = p[key];
+        }
+    });
+}
+
+// Which part of the page each patch key feeds; any other key redraws everything.
+// Most patches are a few log lines or one LOT row, and a patch that only re-sent
+// elapsed_seconds (the version moved but nothing shown did) just re-syncs the timer
+const PATCH_PART = {
+    elapsed_seconds: 'timer', new_logs: 'log', log_seq: 'log',
+    lot_updates: 'lots', lot_statuses: 'lots', skip_lots: 'lots'
+};
+function patchParts(p) {
+    const parts = [];
+    for (const key in p) parts.push(PATCH_PART[key] || 'all');
+    return parts;
+}
+
+// Frames are folded into the model as they arrive, but the page is redrawn at most
+// once per animation frame, covering every part the frames since the last one touched
+let dirtyParts = new Set();
+let renderFrame = 0;
+function scheduleRender(parts) {
+    parts.forEach(function(part) { dirtyParts.add(part); });
+    if (renderFrame) return;
+    renderFrame = requestAnimationFrame(function() {
+        renderFrame = 0;
+        const parts = dirtyParts;
+        dirtyParts = new Set();
+        if (parts.has('all')) {
+            updateDashboard(model);
+            return;
+        }
+        syncTimer(model);
+        if (parts.has('lots')) {
+            reconcileSkipLots(model.skip_lots);
+            renderLots(model.lot_statuses);
+        }
+        if (parts.has('log')) renderLog(model);
+    });
+}
+
+function syncTimer(d) {
+    elapsedBase = d.elapsed_seconds;
+    elapsedAt = Date.now();
+    timerRunning = d.timer_running;
+    renderTimer();
+}
+
+let shownPct = -1;
 function updateDashboard(d) {
     // Timer
-    const mins = Math.floor(d.elapsed_seconds / 60);
-    const secs = d.elapsed_seconds % 60;
-    document.getElementById('timer').textContent =
-        String(mins).padStart(2, '0') + ':' + String(secs).padStart(2, '0');
+    syncTimer(d);
 
     // Finished
-    const fb = document.getElementById('finishedBanner');
+    const fb = els.finishedBanner;
     fb.classList.toggle('visible', d.is_finished);
 
     // Stats
-    document.getElementById('statPhase').textContent = d.current_phase || '--';
-    document.getElementById('statLot').textContent = d.current_lot || '--';
-    document.getElementById('statDone').textContent = d.lots_done;
-    document.getElementById('statFailed').textContent = d.lots_failed;
-    document.getElementById('statSkipped').textContent = d.lots_skipped;
-    document.getElementById('statMemory').textContent =
-        d.memory_mb > 0 ? d.memory_mb.toFixed(0) + ' MB' : '--';
+    setText(els.statPhase, d.current_phase || '--');
+    setText(els.statLot, d.current_lot || '--');
+    setText(els.statDone, d.lots_done);
+    setText(els.statFailed, d.lots_failed);
+    setText(els.statSkipped, d.lots_skipped);
+    setText(els.statMemory, d.memory_mb > 0 ? d.memory_mb.toFixed(0) + ' MB' : '--');
 
     // Paused badge
     isPaused = d.is_paused;
-    document.getElementById('pausedBadge').classList.toggle('visible', d.is_paused);
-    const btn = document.getElementById('btnPause');
-    btn.textContent = d.is_paused ? 'Resume' : 'Pause';
+    els.pausedBadge.classList.toggle('visible', d.is_paused);
+    const btn = els.btnPause;
+    setText(btn, d.is_paused ? 'Resume' : 'Pause');
     btn.classList.toggle('paused', d.is_paused);
 
     // Progress
-    document.getElementById('progressPhase').textContent = d.current_phase || 'Waiting...';
-    document.getElementById('progressStep').textContent = d.current_step || '--';
+    setText(els.progressPhase, d.current_phase || 'Waiting...');
+    setText(els.progressStep, d.current_step || '--');
     const pct = d.lots_total > 0 ? Math.round((d.lots_done / d.lots_total) * 100) : 0;
-    document.getElementById('progressBar').style.width = pct + '%';
-    document.getElementById('progressText').textContent = d.lots_done + ' / ' + d.lots_total;
+    if (pct !== shownPct) {
+        els.progressBar.style.width = pct + '%';
+        shownPct = pct;
+    }
+    setText(els.progressText, d.lots_done + ' / ' + d.lots_total);
 
     // Sliders (skip the one actively being dragged)
     var activeId = document.activeElement ? document.activeElement.id : '';
     if (activeId !== 'sliderShort') setSlider('sliderShort', 'valShort', d.config.delay_short);
     if (activeId !== 'sliderMedium') setSlider('sliderMedium', 'valMedium', d.config.delay_medium);
     if (activeId !== 'sliderLong') setSlider('sliderLong', 'valLong', d.config.delay_long);
-    if (activeId !== 'sliderCheckbox') setSlider('sliderCheckbox', 'valCheckbox', d.config.delay_checkbox);
 
     // LOT table
-    const tbody = document.getElementById('lotTableBody');
-    tbody.innerHTML = '';
-    (d.lot_statuses || []).forEach(lot => {
-        const tr = document.createElement('tr');
-        if (lot.status === 'running') tr.classList.add('running');
-
-        const pillClass = {
-            done: 'pill-done', running: 'pill-running',
-            failed: 'pill-failed', skipped: 'pill-skipped', pending: 'pill-pending'
-        }[lot.status] || 'pill-pending';
-
-        const isSkipped = skipLots.has(String(lot.lot));
-
-        function td(text, style) {
-            const cell = document.createElement('td');
-            cell.textContent = text;
-            if (style) cell.setAttribute('style', style);
-            return cell;
-        }
+    reconcileSkipLots(d.skip_lots);
+    renderLots(d.lot_statuses || []);
 
-        tr.appendChild(td(lot.lot));
-        tr.appendChild(td(lot.count));
-
-        const statusTd = document.createElement('td');
-        const pill = document.createElement('span');
-        pill.className = 'pill ' + pillClass;
-        pill.textContent = lot.status;
-        statusTd.appendChild(pill);
-        tr.appendChild(statusTd);
-
-        tr.appendChild(td(lot.ref_id || '--', 'font-family:monospace;font-size:12px'));
-        tr.appendChild(td(lot.step || '--', 'color:var(--text-secondary);font-size:12px'));
-
-        const actionTd = document.createElement('td');
-        if (lot.status === 'pending') {
-            const btn = document.createElement('button');
-            btn.className = 'skip-btn' + (isSkipped ? ' active' : '');
-            btn.textContent = isSkipped ? 'Unskip' : 'Skip';
-            btn.addEventListener('click', function() { toggleLot(String(lot.lot)); });
-            actionTd.appendChild(btn);
-        }
-        tr.appendChild(actionTd);
+    // Log
+    renderLog(d);
+}
 
-        tbody.appendChild(tr);
+// Log lines already on the page, by the server's line number (log_seq): only lines
+// newer than renderedLogSeq are added, and the oldest are dropped past log_limit
+let renderedLogSeq = 0;
+const logLineTemplate = document.getElementById('logLineTemplate').content.firstElementChild;
+
+function renderLog(d) {
+    const added = d.log_seq - renderedLogSeq;
+    if (added === 0) return;
+    const logBody = els.logBody;
+    const logScroll = els.logScroll;
+    // A scroll already queued counts as at the bottom: it has not been applied yet
+    const wasAtBottom = scrollFrame !== 0 ||
+        logScroll.scrollTop + logScroll.clientHeight >= logScroll.scrollHeight - 30;
+
+    let lines = d.log_messages;
+    if (added < 0) {
+        logBody.textContent = '';  // Server restarted — its numbering started over
+    } else if (added < lines.length) {
+        lines = lines.slice(lines.length - added);
+    }
+    const frag = document.createDocumentFragment();
+    lines.forEach(msg => {
+        const div = logLineTemplate.cloneNode(false);
+        div.textContent = msg;
+        frag.appendChild(div);
     });
+    logBody.appendChild(frag);
+    while (logBody.childElementCount > d.log_limit) logBody.firstChild.remove();
+    renderedLogSeq = d.log_seq;
 
-    // Log
-    const logBody = document.getElementById('logBody');
-    const logScroll = document.getElementById('logScroll');
-    const wasAtBottom = logScroll.scrollTop + logScroll.clientHeight >= logScroll.scrollHeight - 30;
-
-    logBody.innerHTML = '';
-    (d.log_messages || []).forEach(msg => {
-        const div = document.createElement('div');
-        div.className = 'log-line';
-        div.textContent = msg;
-        logBody.appendChild(div);
+    setText(els.logCount, logBody.childElementCount + ' entries');
+    if (wasAtBottom) scrollLogToEnd();
+}
+
+// Follow the log at most once per animation frame: setting scrollTop forces a layout,
+// so a burst of frames queues one scroll instead of one each
+let scrollFrame = 0;
+function scrollLogToEnd() {
+    if (scrollFrame) return;
+    scrollFrame = requestAnimationFrame(function() {
+        scrollFrame = 0;
+        const logScroll = els.logScroll;
+        logScroll.scrollTop = logScroll.scrollHeight;
     });
+}
 
-    document.getElementById('logCount').textContent = d.log_messages.length + ' entries';
-    if (wasAtBottom) logScroll.scrollTop = logScroll.scrollHeight;
+// LOT rows are built once per LOT and kept by LOT number; each render only touches
+// the cells whose value changed, and new rows go in with a single append
+const PILL_CLASS = {
+    done: 'pill-done', running: 'pill-running',
+    failed: 'pill-failed', skipped: 'pill-skipped', pending: 'pill-pending'
+};
+const rowByLot = new Map();
+
+const lotRowTemplate = document.getElementById('lotRowTemplate').content.firstElementChild;
+
+function lotRow(lot) {
+    // One deep clone of the template row instead of a createElement per cell
+    const tr = lotRowTemplate.cloneNode(true);
+    const cells = tr.children;
+    const key = String(lot.lot);
+    cells[0].textContent = lot.lot;
+    cells[1].textContent = lot.count;
+    const row = {
+        tr: tr,
+        pill: cells[2].firstElementChild,
+        ref: cells[3],
+        step: cells[4],
+        action: cells[5],
+        btn: cells[5].firstElementChild,
+        shown: {}
+    };
+    row.btn.addEventListener('click', function() { toggleLot(key); });
+    return row;
+}
+
+function updateLotRow(row, lot) {
+    const shown = row.shown;
+    if (shown.status !== lot.status) {
+        shown.status = lot.status;
+        row.tr.classList.toggle('running', lot.status === 'running');
+        row.pill.className = 'pill ' + (PILL_CLASS[lot.status] || 'pill-pending');
+        row.pill.textContent = lot.status;
+    }
+    const ref = lot.ref_id || '--';
+    if (shown.ref !== ref) row.ref.textContent = shown.ref = ref;
+    const step = lot.step || '--';
+    if (shown.step !== step) row.step.textContent = shown.step = step;
+
+    // Skip button only while pending; its label follows skipLots (see toggleLot)
+    const skip = lot.status === 'pending' ? skipLots.has(String(lot.lot)) : null;
+    if (shown.skip !== skip) {
+        shown.skip = skip;
+        if (skip === null) {
+            row.btn.remove();
+        } else {
+            row.btn.className = 'skip-btn' + (skip ? ' active' : '');
+            row.btn.textContent = skip ? 'Unskip' : 'Skip';
+            if (!row.btn.parentNode) row.action.appendChild(row.btn);
+        }
+    }
+}
+
+function renderLots(lots) {
+    const tbody = els.lotTableBody;
+    if (lots.length < rowByLot.size) {
+        // The LOT list shrank (never happens mid-run) — start the table over
+        rowByLot.clear();
+        tbody.textContent = '';
+    }
+    const frag = document.createDocumentFragment();
+    lots.forEach(function(lot) {
+        const key = String(lot.lot);
+        let row = rowByLot.get(key);
+        if (!row) {
+            row = lotRow(lot);
+            rowByLot.set(key, row);
+            frag.appendChild(row.tr);
+        }
+        updateLotRow(row, lot);
+    });
+    if (frag.firstChild) tbody.appendChild(frag);
 }
 
 function setSlider(sliderId, valId, value) {
-    document.getElementById(sliderId).value = value;
-    document.getElementById(valId).textContent = parseFloat(value).toFixed(1) + 's';
+    const slider = els[sliderId];
+    if (slider.value !== String(value)) slider.value = value;
+    setText(els[valId], Number(value).toFixed(1) + 's');
 }
 
 function togglePause() {
     sendControl(isPaused ? 'resume' : 'pause');
 }
 
+// Control POSTs go out one after another: the server handles each request on its own
+// thread, so two in flight at once (Pause then Resume) could be applied in either order
+let controlQueue = Promise.resolve();
+// Resolves to the response, or undefined if the request failed
 function sendControl(action, extra) {
-    fetch('/api/control', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify(Object.assign({action: action}, extra || {}))
-    }).catch(function(err) { console.error('Control request failed:', err); });
+    const body = JSON.stringify(Object.assign({action: action}, extra || {}));
+    controlQueue = controlQueue.then(function() {
+        return fetch('/api/control', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: body
+        }).catch(function(err) { console.error('Control request failed:', err); });
+    });
+    return controlQueue;
 }
 
+// One passive listener for all the delay sliders: each names its config key and label
+els.delaySliders.addEventListener('input', function(e) {
+    const slider = e.target;
+    if (slider.dataset.key) updateDelay(slider.dataset.key, slider.value, slider.dataset.val);
+}, {passive: true});
+
 function updateDelay(key, value, valId) {
-    document.getElementById(valId).textContent = parseFloat(value).toFixed(1) + 's';
-    clearTimeout(debounceTimers[key]);
-    debounceTimers[key] = setTimeout(function() {
-        const config = {};
-        config[key] = parseFloat(value);
+    const seconds = Number(value);  // A range input's value is always a plain number
+    setText(els[valId], seconds.toFixed(1) + 's');
+    pendingConfig[key] = seconds;
+    clearTimeout(configTimer);
+    configTimer = setTimeout(function() {
+        const config = pendingConfig;
+        pendingConfig = {};
         sendControl('update_config', {config: config});
     }, 200);
 }
 
+// A click flips the button at once; the server's skip list takes over again once no
+// toggle is in flight, since frames sent before a toggle landed still carry the old list
+let skipsInFlight = 0;
 function toggleLot(lot) {
     if (skipLots.has(lot)) skipLots.delete(lot); else skipLots.add(lot);
-    sendControl('toggle_lot', {lot: lot});
+    if (model) renderLots(model.lot_statuses);
+    skipsInFlight++;
+    sendControl('toggle_lot', {lot: lot})
+        .then(function(res) { return res && res.ok ? res.json() : null; })
+        .catch(function() { return null; })
+        .then(function(body) {
+            if (--skipsInFlight > 0 || !model) return;
+            reconcileSkipLots(body ? body.skip_lots : model.skip_lots);
+            renderLots(model.lot_statuses);
+        });
+}
+
+// Adopt the server's skip list unless a toggle is still on its way to it
+function reconcileSkipLots(lots) {
+    if (skipsInFlight > 0 || !lots) return;
+    if (lots.length === skipLots.size && lots.every(function(lot) { return skipLots.has(lot); })) return;
+    skipLots = new Set(lots);
 }
 
 connectSSE();
@@ -980,25 +1420,29 @@ connectSSE();
 </html>
 """
 
+DASHBOARD_HTML_BYTES = DASHBOARD_HTML.encode("utf-8")
+DASHBOARD_ETAG = hashlib.md5(DASHBOARD_HTML_BYTES).hexdigest()
+
 
 # ── Standalone test ──
 
 if __name__ == "__main__":
     state = DashboardState()
     control = ControlFlags()
-    state.start_time = time.time()
-    state.current_phase = "Phase 1"
-    state.current_lot = "3"
-    state.current_step = "Step 4: Verifying count"
-    state.lots_total = 10
-    state.lots_done = 2
-    state.lot_statuses = [
-        {"lot": str(i), "count": 7, "status": "done" if i <= 2 else ("running" if i == 3 else "pending"),
-         "ref_id": f"C32046{i}082" if i <= 2 else "", "step": "Verifying count" if i == 3 else ""}
-        for i in range(1, 11)
-    ]
-    state.log_messages.append(f"{datetime.now().strftime('%H:%M:%S')}  Dashboard started in standalone test mode")
-    state.log_messages.append(f"{datetime.now().strftime('%H:%M:%S')}  Open http://127.0.0.1:5555 to preview")
+    with state.lock:
+        state.start_time = time.monotonic()
+        state.current_phase = "Phase 1"
+        state.current_lot = "3"
+        state.current_step = "Step 4: Verifying count"
+        state.lots_total = 10
+        state.lots_done = 2
+        state.lot_statuses = [
+            {"lot": str(i), "count": 7, "status": "done" if i <= 2 else ("running" if i == 3 else "pending"),
+             "ref_id": f"C32046{i}082" if i <= 2 else "", "step": "Verifying count" if i == 3 else ""}
+            for i in range(1, 11)
+        ]
+    state.log(f"{datetime.now().strftime('%H:%M:%S')}  Dashboard started in standalone test mode")
+    state.log(f"{datetime.now().strftime('%H:%M:%S')}  Open http://127.0.0.1:5555 to preview")
 
     start_dashboard(state, control)
     print("Dashboard running at http://127.0.0.1:5555 (test mode)")
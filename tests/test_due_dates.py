@@ -0,0 +1,38 @@
+import unittest
+
+from dop_automate import validate_due_dates_on_page
+
+
+class FakeDriver:
+    """Stands in for the WebDriver: READ_DUE_DATES_JS returns the given rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_script(self, script, *args):
+        return self.rows
+
+
+class ValidateDueDatesTest(unittest.TestCase):
+
+    def bad_rows(self, *rows):
+        return validate_due_dates_on_page(FakeDriver(list(rows)), expected_month="Feb")
+
+    def test_matching_month_is_good(self):
+        self.assertEqual(self.bad_rows(("1", "15-Feb-2026")), [])
+
+    def test_prefixed_cell_uses_the_date_month(self):
+        self.assertEqual(self.bad_rows(("1", "Due 15-Feb-2026"), ("2", "Mon, 15-Feb-2026")), [])
+
+    def test_other_month_is_bad(self):
+        self.assertEqual(self.bad_rows(("1", "Due 15-Mar-2026")), [("1", "Due 15-Mar-2026")])
+
+    def test_cell_without_a_date_is_bad(self):
+        self.assertEqual(self.bad_rows(("1", "Feb")), [("1", "Feb")])
+
+    def test_empty_cell_is_skipped(self):
+        self.assertEqual(self.bad_rows(("1", "")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
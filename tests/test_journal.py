@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import dop_automate
+from dop_automate import Lot, journal_path, replay_journal, save_progress, flush_progress, read_xlsx
+
+
+def make_lot(lot, count=3):
+    return Lot(lot, "1,2,3", count, "", "", "", "", "", "", "", "", "", "")
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.xlsx = os.path.join(self.dir, "lots.xlsx")
+        # The journal is module state: start each test with none open
+        dop_automate._journal_file = None
+        dop_automate._lots_since_save = 0
+        dop_automate._lot_in_progress = None
+
+    def tearDown(self):
+        if dop_automate._journal_file is not None:
+            dop_automate._journal_file.close()
+            dop_automate._journal_file = None
+        shutil.rmtree(self.dir)
+
+    def test_replay_restores_saved_lots(self):
+        lot = make_lot("2")
+        lot.Reference_ID = "C320461082"
+        lot.Pay_Status = "OK"
+        save_progress(self.xlsx, [make_lot("1"), lot], lot)
+        dop_automate._journal_file.close()
+        dop_automate._journal_file = None
+
+        fresh = [make_lot("1"), make_lot("2")]
+        self.assertEqual(replay_journal(self.xlsx, fresh), 1)
+        self.assertEqual(fresh[1].Reference_ID, "C320461082")
+        self.assertEqual(fresh[1].Pay_Status, "OK")
+        self.assertEqual(fresh[0].Pay_Status, "")
+
+    def test_later_entries_win_and_junk_is_skipped(self):
+        with open(journal_path(self.xlsx), "w", encoding="utf-8") as f:
+            f.write('{"LOT": "1", "Pay_Status": "FAIL"}\n')
+            f.write('{"LOT": "9", "Pay_Status": "OK"}\n')  # Not in this workbook
+            f.write('{"LOT": "1", "Pay_Status": "OK"}\n')
+            f.write('{"LOT": "1", "Pay_St')  # Torn by a crash mid-write
+        lots = [make_lot("1")]
+        self.assertEqual(replay_journal(self.xlsx, lots), 2)
+        self.assertEqual(lots[0].Pay_Status, "OK")
+
+    def test_no_journal_replays_nothing(self):
+        self.assertEqual(replay_journal(self.xlsx, [make_lot("1")]), 0)
+
+    def test_flush_writes_xlsx_and_drops_journal(self):
+        lots = [make_lot("1"), make_lot("2")]
+        lots[0].Pay_Status = "OK"
+        save_progress(self.xlsx, lots, lots[0])
+        self.assertTrue(os.path.exists(journal_path(self.xlsx)))
+
+        self.assertTrue(flush_progress(self.xlsx, lots))
+        self.assertFalse(os.path.exists(journal_path(self.xlsx)))
+        self.assertEqual([lot.Pay_Status for lot in read_xlsx(self.xlsx)], ["OK", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from dop_automate import _format_lot_range, _format_lot_list, _merged_filename
+
+
+class FormatLotRangeTest(unittest.TestCase):
+
+    def test_runs_collapse(self):
+        self.assertEqual(_format_lot_range([1, 2, 3, 5, 7, 8, 9]), "1-3,5,7-9")
+
+    def test_unsorted_and_duplicates(self):
+        self.assertEqual(_format_lot_range([3, 1, 2, 2]), "1-3")
+
+    def test_non_numeric_lots_are_listed(self):
+        self.assertEqual(_format_lot_list([1, "2A", 3]), "1,2A,3")
+        self.assertEqual(_merged_filename([4, 5, 6, 9]), "Merged_4-6,9.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
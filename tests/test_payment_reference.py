@@ -0,0 +1,40 @@
+import unittest
+
+from dop_automate import read_payment_reference
+
+
+class FakeDriver:
+    """Stands in for the WebDriver: the page's innerText is the given string."""
+
+    def __init__(self, body_text):
+        self.body_text = body_text
+
+    def execute_script(self, script, *args):
+        if isinstance(self.body_text, Exception):
+            raise self.body_text
+        return self.body_text
+
+
+class ReadPaymentReferenceTest(unittest.TestCase):
+
+    def test_reference_number_sentence(self):
+        page = ("Agent A1234567 logged in\n"
+                "Payment successful. Your reference number is C320461082\n"
+                "Back")
+        self.assertEqual(read_payment_reference(FakeDriver(page)),
+                         ("Payment successful. Your reference number is C320461082", "C320461082"))
+
+    def test_fallback_only_on_payment_lines(self):
+        page = "Agent A1234567 logged in\nPayment successful: C320461082"
+        self.assertEqual(read_payment_reference(FakeDriver(page))[1], "C320461082")
+
+    def test_stray_code_elsewhere_is_ignored(self):
+        page = "Agent A1234567 logged in\nPayment successful"
+        self.assertEqual(read_payment_reference(FakeDriver(page)), ("Payment successful", ""))
+
+    def test_unreadable_page(self):
+        self.assertEqual(read_payment_reference(FakeDriver(RuntimeError("gone"))), ("", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from dop_dashboard import DashboardState, _state_patch
+
+
+class StatePatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state = DashboardState()
+        with self.state.lock:
+            self.state.lot_statuses = [{"lot": "1", "status": "pending"},
+                                       {"lot": "2", "status": "pending"}]
+
+    def test_only_changes_are_sent(self):
+        before = self.state.to_dict()
+        with self.state.lock:
+            self.state.current_step = "Step 3"
+            self.state.update_lot(1, status="running")
+        self.state.log("fetched")
+        patch = _state_patch(before, self.state.to_dict())
+        self.assertEqual(patch["current_step"], "Step 3")
+        self.assertEqual(patch["lot_updates"], {"1": {"lot": "2", "status": "running"}})
+        self.assertEqual(patch["new_logs"], ["fetched"])
+        self.assertNotIn("lots_done", patch)
+
+    def test_unchanged_state_only_carries_elapsed(self):
+        snap = self.state.to_dict()
+        self.assertEqual(_state_patch(snap, self.state.to_dict()), {"elapsed_seconds": 0})
+
+    def test_resized_lot_list_is_sent_whole(self):
+        before = self.state.to_dict()
+        with self.state.lock:
+            self.state.lot_statuses.append({"lot": "3", "status": "pending"})
+        patch = _state_patch(before, self.state.to_dict())
+        self.assertEqual(len(patch["lot_statuses"]), 3)
+        self.assertNotIn("lot_updates", patch)
+
+
+if __name__ == "__main__":
+    unittest.main()